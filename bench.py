@@ -0,0 +1,1349 @@
+#!/usr/bin/env python3
+"""Benchmarks for That Clock Sucks
+
+Drives ClockApp against an in-memory stand-in for the curses screen and a
+simulated clock, so frames can be measured without a real terminal.
+
+    python3 bench.py render                 # run and print the results
+    python3 bench.py render --save FILE     # also save them as a baseline
+    python3 bench.py render --compare FILE  # exit 1 on a regression
+    python3 bench.py serve --clients 500    # clock server load test
+    python3 bench.py dashboard --clocks 60  # timezone dashboard tick cost
+    python3 bench.py startup                # import time and time to first frame
+    python3 bench.py latency                # keypress-to-screen time under key repeat
+    python3 bench.py timer --fps 60         # CPU of a running stopwatch/countdown
+    python3 bench.py alarms --entries 10000 # alarm schedule cost and firing accuracy
+    python3 bench.py config                 # malformed config.json values don't crash
+    python3 bench.py export                 # export memory, saved tables match rendering
+    python3 bench.py update                 # update check and download against a local server
+"""
+import argparse
+import asyncio
+import contextlib
+import curses
+import hashlib
+import http.server
+import io
+import json
+import mmap
+import os
+import random
+import py_compile
+import selectors
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import zipfile
+from unittest import mock
+
+import main
+
+# Fixed start time (local) so every run renders the same frames, chosen to
+# cross a minute, an hour and the AM/PM boundary within a minute of ticks
+START_TIME = time.mktime((2026, 1, 1, 11, 59, 30, 0, 0, -1))
+
+# Timed rounds per scenario (the best one counts) and frames traced for allocations
+ROUNDS = 3
+ALLOC_TICKS = 10
+# Frames checked for overlays being drawn over, per overlay arrangement
+STACKING_TICKS = 5
+
+class FakeTerminal:
+    """The terminal behind the FakeScreen windows, modelled the way ncurses updates it
+
+    Windows copy their touched lines into a virtual screen on noutrefresh();
+    update_panels() touches the lines of every panel above a touched line and
+    stages the panels bottom to top, and doupdate() sends the cells that differ
+    from what the terminal shows. Bytes are estimated per run of changed cells:
+    a cursor move, an attribute change when it differs from the previous run
+    and the UTF-8 text. stacking_errors() compares the result with the visible
+    panels painted in stacking order.
+
+    fake_terminal() routes curses.newwin(), curses.doupdate() and the panel
+    calls to the most recently created FakeTerminal.
+    """
+
+    current = None
+
+    def __init__(self, height=30, width=100):
+        self.height = height
+        self.width = width
+        self.virtual = [[(' ', 0)] * width for _ in range(height)]
+        self.physical = [row[:] for row in self.virtual]
+        self.changed_rows = set()  # Rows of the virtual screen written since doupdate()
+        self.clear_pending = False
+        self.panels = []  # Bottom to top
+        self.updates = 0
+        self.flushed_bytes = 0
+        self.stdscr = self.newwin(height, width, 0, 0)
+        FakeTerminal.current = self
+
+    def newwin(self, height, width, y=0, x=0):
+        if height <= 0 or width <= 0 or y + height > self.height or x + width > self.width:
+            raise curses.error("newwin() returned NULL")
+        return FakeScreen(self, height, width, y, x)
+
+    def new_panel(self, window):
+        panel = FakePanel(self, window)
+        self.panels.append(panel)
+        panel.touch()
+        return panel
+
+    def visible_panels(self):
+        return [panel for panel in self.panels if not panel.hidden()]
+
+    def update_panels(self):
+        panels = self.visible_panels()
+        for i, lower in enumerate(panels):
+            for upper in panels[i + 1:]:
+                for row in lower.window().touched:
+                    upper.touch_screen_row(lower.window().y + row, lower)
+        for panel in panels:
+            panel.window().noutrefresh()
+
+    def doupdate(self):
+        self.updates += 1
+        if self.clear_pending:
+            # Clearing the terminal resends every cell
+            self.flushed_bytes += len("\033[H\033[2J")
+            self.physical = [[None] * self.width for _ in range(self.height)]
+            self.changed_rows.update(range(self.height))
+            self.clear_pending = False
+        last_attr = 0
+        for y in sorted(self.changed_rows):
+            row, shown = self.virtual[y], self.physical[y]
+            if row == shown:
+                continue
+            x = 0
+            while x < self.width:
+                if row[x] == shown[x]:
+                    x += 1
+                    continue
+                start = x
+                while x < self.width and row[x] != shown[x]:
+                    x += 1
+                text = ''.join(char for char, _ in row[start:x])
+                self.flushed_bytes += len(f"\033[{y + 1};{start + 1}H") + len(text.encode())
+                attr = row[start][1]
+                if attr != last_attr:
+                    self.flushed_bytes += len("\033[0;31m")
+                    last_attr = attr
+                shown[start:x] = row[start:x]
+        self.changed_rows.clear()
+
+    def stacking_errors(self):
+        """Cells where the terminal doesn't show the topmost visible panel's content"""
+        expected = [[(' ', 0)] * self.width for _ in range(self.height)]
+        for panel in self.visible_panels():
+            window = panel.window()
+            for row, cells in enumerate(window.cells):
+                expected[window.y + row][window.x:window.x + window.width] = cells
+        return sum(cell != shown for row, shown_row in zip(expected, self.physical)
+                   for cell, shown in zip(row, shown_row))
+
+class FakeScreen:
+    """In-memory curses window: keeps its cells and touched lines like an ncurses window"""
+
+    def __init__(self, terminal, height, width, y=0, x=0):
+        self.terminal = terminal
+        self.height = height
+        self.width = width
+        self.y = y
+        self.x = x
+        self.keys = []
+        self.cells = [[(' ', 0)] * width for _ in range(height)]
+        self.touched = set()
+        self.clear_requested = False
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def addstr(self, y, x, text, attr=0):
+        if y >= self.height or x >= self.width:
+            raise curses.error("addstr() returned ERR")
+        text = text[:self.width - x]
+        self.cells[y][x:x + len(text)] = [(char, attr) for char in text]
+        self.touched.add(y)
+
+    def erase(self):
+        self.cells = [[(' ', 0)] * self.width for _ in range(self.height)]
+        self.touched.update(range(self.height))
+
+    def clear(self):
+        # Like erase(), and the next refresh repaints the whole terminal
+        self.erase()
+        self.clear_requested = True
+
+    def noutrefresh(self):
+        for row in self.touched:
+            self.terminal.virtual[self.y + row][self.x:self.x + self.width] = self.cells[row]
+            self.terminal.changed_rows.add(self.y + row)
+        self.touched.clear()
+        if self.clear_requested:
+            self.terminal.clear_pending = True
+            self.clear_requested = False
+
+    def refresh(self):
+        self.noutrefresh()
+        self.terminal.doupdate()
+
+    def getch(self):
+        return self.keys.pop(0) if self.keys else -1
+
+    def nodelay(self, flag):
+        pass
+
+    def timeout(self, delay):
+        pass
+
+    def keypad(self, flag):
+        pass
+
+class FakePanel:
+    """Stand-in for a curses.panel panel in its FakeTerminal's stack"""
+
+    def __init__(self, terminal, window):
+        self.terminal = terminal
+        self._window = window
+        self._hidden = False
+
+    def window(self):
+        return self._window
+
+    def touch(self):
+        self._window.touched.update(range(self._window.height))
+
+    def overlaps(self, other):
+        a, b = self._window, other.window()
+        return (a.y < b.y + b.height and b.y < a.y + a.height
+                and a.x < b.x + b.width and b.x < a.x + a.width)
+
+    def touch_screen_row(self, screen_row, below):
+        """Touch our line at a screen row where the panel below us changed"""
+        row = screen_row - self._window.y
+        if 0 <= row < self._window.height and self.overlaps(below):
+            self._window.touched.add(row)
+
+    def show(self):
+        # Like show_panel(): move to the top and redraw the whole panel
+        self.terminal.panels.remove(self)
+        self.terminal.panels.append(self)
+        self._hidden = False
+        self.touch()
+
+    def hide(self):
+        # Like hide_panel(): the panels it covered are redrawn where it was
+        self._hidden = True
+        window = self._window
+        for panel in self.terminal.visible_panels():
+            if panel.overlaps(self):
+                for screen_row in range(window.y, window.y + window.height):
+                    panel.touch_screen_row(screen_row, self)
+
+    def hidden(self):
+        return self._hidden
+
+@contextlib.contextmanager
+def fake_terminal():
+    """Let ClockApp run without initscr(): stub the curses calls that need a terminal
+    and keep config.json and alarms.json away from the real ones"""
+    with tempfile.TemporaryDirectory() as temp_dir, \
+            mock.patch.object(main, 'CONFIG_FILE', os.path.join(temp_dir, 'config.json')), \
+            mock.patch.object(main, 'ALARMS_FILE', os.path.join(temp_dir, 'alarms.json')), \
+            mock.patch.object(curses, 'has_colors', lambda: True), \
+            mock.patch.object(curses, 'start_color', lambda: None), \
+            mock.patch.object(curses, 'init_pair', lambda *args: None), \
+            mock.patch.object(curses, 'curs_set', lambda visibility: None), \
+            mock.patch.object(curses, 'color_pair', lambda n: n << 8), \
+            mock.patch.object(curses, 'has_extended_color_support', lambda: True, create=True), \
+            mock.patch.object(curses, 'COLORS', 256, create=True), \
+            mock.patch.object(curses, 'COLOR_PAIRS', 256, create=True), \
+            mock.patch.object(curses, 'newwin', lambda *args: FakeTerminal.current.newwin(*args)), \
+            mock.patch.object(curses, 'doupdate', lambda: FakeTerminal.current.doupdate()), \
+            mock.patch.object(curses.panel, 'new_panel', lambda window: FakeTerminal.current.new_panel(window)), \
+            mock.patch.object(curses.panel, 'update_panels', lambda: FakeTerminal.current.update_panels()):
+        yield
+
+def make_app(screen, font=0, color=0, twelve_hour=False, seconds=True):
+    """Create a ClockApp on a fake screen with the given display settings"""
+    app = main.ClockApp(screen)
+    app.current_font = font
+    app.current_color = color
+    app.time_format_12hour = twelve_hour
+    app.show_seconds = seconds
+    app.time_source = main.FakeTimeSource(START_TIME)
+    app.update_menu_items()
+    return app
+
+def render_scenarios():
+    """Every font, colour mode, 12h/24h and seconds on/off combination"""
+    for font in range(len(main.FONTS)):
+        for color in range(len(main.COLOR_NAMES)):
+            for twelve_hour in (False, True):
+                for seconds in (True, False):
+                    name = f"font{font}-color{color}-{'12h' if twelve_hour else '24h'}-{'sec' if seconds else 'nosec'}"
+                    yield name, dict(font=font, color=color, twelve_hour=twelve_hour, seconds=seconds)
+
+def bench_render(scenario, ticks):
+    """Measure one scenario over a number of simulated ticks"""
+    terminal = FakeTerminal()
+    app = make_app(terminal.stdscr, **scenario)
+    step = 1 if scenario['seconds'] else 60
+
+    # The first frame paints everything; steady-state ticks are measured separately
+    app.display_clock()
+    first_frame_bytes = terminal.flushed_bytes
+    terminal.flushed_bytes = 0
+
+    frame_bytes = 0
+    best = None
+    for _ in range(ROUNDS):
+        terminal.flushed_bytes = 0
+        elapsed = 0.0
+        for _ in range(ticks):
+            app.time_source.advance(step)
+            started = time.perf_counter()
+            app.display_clock()
+            elapsed += time.perf_counter() - started
+        frame_bytes = max(frame_bytes, terminal.flushed_bytes)
+        best = elapsed if best is None else min(best, elapsed)
+
+    # Allocation peak per frame is measured in a separate pass because
+    # tracemalloc slows everything down
+    tracemalloc.start()
+    peak = 0
+    for _ in range(ALLOC_TICKS):
+        app.time_source.advance(step)
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        app.display_clock()
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    # Frames where nothing changed should not reach the terminal at all
+    updates = terminal.updates
+    app.display_clock()
+    idle_refreshes = terminal.updates - updates
+
+    # Overlays must stay on top of the clock changing beneath them: the menu
+    # over the centered clock, then the hint and stats over a scaled-up one
+    stacking_errors = 0
+    app.menu_open = True
+    for auto_scale in (False, True):
+        app.auto_scale = auto_scale
+        app.show_stats = auto_scale
+        for _ in range(STACKING_TICKS):
+            app.time_source.advance(step)
+            app.display_clock()
+            stacking_errors += terminal.stacking_errors()
+        app.menu_open = False
+
+    return {
+        'frame_us': best / ticks * 1e6,
+        'bytes_per_s': frame_bytes / (ticks * step),
+        'bytes_per_frame': frame_bytes / ticks,
+        'first_frame_bytes': first_frame_bytes,
+        'alloc_peak_bytes': peak,
+        'idle_refreshes': idle_refreshes,
+        'stacking_errors': stacking_errors,
+    }
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2] if values else 0.0
+
+def compare(results, baseline, threshold):
+    """Return the ways the results got slower or noisier than the baseline
+
+    Output bytes are deterministic and compared per scenario. Frame times
+    jitter too much individually, so their median across scenarios is used.
+    """
+    regressions = []
+    shared = [name for name in results if name in baseline]
+    for name in shared:
+        old, new = baseline[name]['bytes_per_s'], results[name]['bytes_per_s']
+        if new > old * (1 + threshold) + 1:
+            regressions.append(f"{name}: {old:.0f} -> {new:.0f} bytes/s")
+    old_median = median(baseline[name]['frame_us'] for name in shared)
+    new_median = median(results[name]['frame_us'] for name in shared)
+    if shared and new_median > old_median * (1 + threshold):
+        regressions.append(f"median frame time {old_median:.1f}us -> {new_median:.1f}us")
+    return regressions
+
+def run_render(args):
+    results = {}
+    with fake_terminal():
+        for name, scenario in render_scenarios():
+            if args.filter and args.filter not in name:
+                continue
+            results[name] = result = bench_render(scenario, args.ticks)
+            print(f"{name:32} {result['frame_us']:8.1f} us/frame {result['bytes_per_s']:8.1f} B/s "
+                  f"{result['alloc_peak_bytes']:7d} B alloc peak {result['first_frame_bytes']:6d} B first frame")
+
+    frame_times = [result['frame_us'] for result in results.values()]
+    print(f"\n{len(results)} scenarios, median {median(frame_times):.1f} us/frame, "
+          f"worst {max(frame_times):.1f} us/frame")
+
+    status = 0
+    if any(result['idle_refreshes'] for result in results.values()):
+        print("FAIL: an unchanged frame refreshed the screen")
+        status = 1
+    if any(result['stacking_errors'] for result in results.values()):
+        print("FAIL: the clock drew over an overlay above it")
+        status = 1
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            status = 1
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    return status
+
+# Dashboard layouts as (name, terminal height, width, color): a wall big
+# enough for 60 clocks in the big font, the same in the hue gradient, and a
+# terminal small enough to need one line per clock
+DASHBOARD_SCENARIOS = [
+    ('wall', 120, 250, 0),
+    ('wall-gradient', 120, 250, main.GRADIENT),
+    ('small', 40, 160, 0),
+]
+
+def dashboard_clocks(count):
+    """count labelled clocks in different timezones, the same ones every run"""
+    try:
+        import zoneinfo
+        zones = sorted(zoneinfo.available_timezones())
+    except ImportError:
+        zones = []
+    zones = random.Random(0).sample(zones, min(count, len(zones))) if zones else []
+    zones += ['UTC'] * (count - len(zones))
+    return [{"label": zone.rsplit('/', 1)[-1].replace('_', ' '), "timezone": zone} for zone in zones]
+
+def bench_dashboard(clocks, height, width, color, ticks):
+    """Cost of the dashboard's ticks with the given clocks on a height x width terminal"""
+    terminal = FakeTerminal(height, width)
+    app = make_app(terminal.stdscr, color=color)
+    app.dashboard = True
+    app.dashboard_clocks = clocks
+
+    app.display_clock()
+    first_frame_bytes = terminal.flushed_bytes
+
+    best = None
+    for _ in range(ROUNDS):
+        terminal.flushed_bytes = 0
+        elapsed = 0.0
+        for _ in range(ticks):
+            app.time_source.advance(1)
+            started = time.perf_counter()
+            app.display_clock()
+            elapsed += time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    updates = terminal.updates
+    app.display_clock()
+    # Big clocks always have a label cell, lines are one 'panel' cell each
+    big = any(key[0] == 'panel_label' for key in app.renderer.cells)
+    return {
+        'shown': sum(1 for key in app.renderer.cells if key[0] == ('panel_label' if big else 'panel')),
+        'big': big,
+        'tick_ms': best / ticks * 1e3,
+        'bytes_per_tick': terminal.flushed_bytes / ticks,
+        'first_frame_bytes': first_frame_bytes,
+        'idle_refreshes': terminal.updates - updates,
+    }
+
+def run_dashboard(args):
+    clocks = dashboard_clocks(args.clocks)
+    status = 0
+    with fake_terminal():
+        for name, height, width, color in DASHBOARD_SCENARIOS:
+            result = bench_dashboard(clocks, height, width, color, args.ticks)
+            layout = 'big font' if result['big'] else 'one line each'
+            print(f"{name:13} {width}x{height}: {result['shown']:3d}/{len(clocks)} clocks shown, "
+                  f"{layout:13} {result['tick_ms']:6.2f} ms/tick "
+                  f"({result['tick_ms'] * 1e3 / max(1, result['shown']):5.1f} us per clock), "
+                  f"{result['bytes_per_tick']:6.0f} B/tick, {result['first_frame_bytes']} B first frame")
+            if result['tick_ms'] > args.max_tick_ms:
+                print(f"FAIL: a tick took more than {args.max_tick_ms:.1f} ms")
+                status = 1
+            if result['idle_refreshes']:
+                print("FAIL: an unchanged frame refreshed the screen")
+                status = 1
+    return status
+
+class ServerThread(threading.Thread):
+    """Run a ClockServer on its own event loop, ticked on demand by the benchmark
+
+    CPU time is measured with time.thread_time() inside the server thread,
+    so it only counts the server's work and not the clients'.
+    """
+
+    def __init__(self, address):
+        super().__init__(daemon=True)
+        self.address = address
+        self.time_source = main.FakeTimeSource(START_TIME)
+        self.server = main.ClockServer(main.load_config(), self.time_source)
+        self.loop = asyncio.new_event_loop()
+        self.ready = threading.Event()
+        self.cpu = 0.0
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        listener = self.loop.run_until_complete(main.start_server(self.server, self.address))
+        self.ready.set()
+        self.loop.run_forever()
+        listener.close()
+        self.loop.run_until_complete(listener.wait_closed())
+        self.loop.close()
+
+    def call(self, func, *args):
+        """Run func on the server thread and return the CPU time it took there"""
+        done = threading.Event()
+        spent = []
+
+        def timed():
+            started = time.thread_time()
+            func(*args)
+            spent.append(time.thread_time() - started)
+            done.set()
+        self.loop.call_soon_threadsafe(timed)
+        done.wait()
+        return spent[0]
+
+    def tick(self):
+        self.time_source.advance(1)
+        return self.call(self.server.tick)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.join()
+
+def drain(clients, received, expected, timeout=10.0):
+    """Read from the client sockets until each has everything the server sent it"""
+    selector = selectors.DefaultSelector()
+    for sock in clients:
+        if received[sock] < expected(sock):
+            selector.register(sock, selectors.EVENT_READ)
+    deadline = time.monotonic() + timeout
+    while selector.get_map() and time.monotonic() < deadline:
+        for key, _ in selector.select(0.1):
+            sock = key.fileobj
+            received[sock] += len(sock.recv(65536))
+            if received[sock] >= expected(sock):
+                selector.unregister(sock)
+    selector.close()
+
+def connect_client(thread, address):
+    """Connect a client socket and return it with its stream on the server side"""
+    known = set(thread.server.clients)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(address)
+    while len(thread.server.clients) == len(known):
+        time.sleep(0.001)
+    stream, = set(thread.server.clients) - known
+    return sock, stream
+
+def run_serve(args):
+    with tempfile.TemporaryDirectory() as temp_dir, \
+            mock.patch.object(main, 'CONFIG_FILE', os.path.join(temp_dir, 'config.json')):
+        address = os.path.join(temp_dir, 'clock.sock')
+        thread = ServerThread(address)
+        thread.start()
+        thread.ready.wait()
+        thread.tick()  # First frame, so clients get a keyframe as they connect
+
+        # A client that never reads: the server must drop its frames, not stall
+        stalled, stalled_stream = connect_client(thread, address)
+        streams = dict(connect_client(thread, address) for _ in range(args.clients))
+        received = dict.fromkeys(streams, 0)
+
+        def expected(sock):
+            return streams[sock].bytes_sent
+
+        drain(streams, received, expected)
+
+        cpu = 0.0
+        started = time.perf_counter()
+        for _ in range(args.ticks):
+            cpu += thread.tick()
+            drain(streams, received, expected)
+        elapsed = time.perf_counter() - started
+
+        missing = sum(1 for sock in streams if received[sock] != expected(sock))
+        for sock in streams:
+            sock.close()
+
+        # Keep ticking until the server starts dropping the stalled client's
+        # frames, then check that they stay dropped instead of queued
+        stall_ticks = 0
+        while not stalled_stream.frames_dropped and stall_ticks < 100000:
+            thread.tick()
+            stall_ticks += 1
+        for _ in range(10):
+            thread.tick()
+        buffered = stalled_stream.transport.get_write_buffer_size()
+        unread = stalled_stream.bytes_sent - buffered
+        stalled.close()
+        thread.stop()
+
+    frames = args.ticks * args.clients
+    print(f"{args.clients} clients, {args.ticks} ticks: server CPU {cpu / args.ticks * 1e3:.2f} ms/tick, "
+          f"{cpu / frames * 1e6:.1f} us per client frame, {cpu / args.ticks * 100:.1f}% of one core")
+    print(f"wall time {elapsed:.2f}s, {sum(received.values())} bytes delivered")
+    print(f"stalled client: frames dropped after {stall_ticks} ticks, then {stalled_stream.frames_dropped} "
+          f"frames dropped with {buffered} bytes buffered and {unread} in the socket "
+          f"(high-water mark {main.CLIENT_HIGH_WATER})")
+    status = 0
+    if stalled_stream.frames_dropped < 10 or buffered > 2 * main.CLIENT_HIGH_WATER:
+        print("FAIL: the stalled client's backlog was not capped")
+        status = 1
+    if stall_ticks > args.max_stall_ticks:
+        print(f"FAIL: the stalled client was sent {stall_ticks} frames before they were dropped")
+        status = 1
+    if missing:
+        print(f"FAIL: {missing} clients did not receive every frame")
+        status = 1
+    if cpu / args.ticks > args.max_tick_cpu:
+        print(f"FAIL: server CPU per tick above {args.max_tick_cpu * 1e3:.0f} ms")
+        status = 1
+    return status
+
+# Child process for the startup benchmark: times `import main` and the first
+# frame, leaving out the benchmark's own imports
+FIRST_FRAME_SCRIPT = """
+import sys, time
+started = time.perf_counter()
+sys.path.insert(0, {root!r})
+import main
+imported = time.perf_counter()
+import bench
+with bench.fake_terminal():
+    harness = time.perf_counter()
+    app = main.ClockApp(bench.FakeTerminal().stdscr)
+    app.display_clock()
+    done = time.perf_counter()
+print((imported - started) * 1e3, (done - harness) * 1e3)
+"""
+
+def measure_startup(runs):
+    """Median milliseconds of each startup phase over separate processes"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    script = FIRST_FRAME_SCRIPT.format(root=root)
+    # Make sure main's bytecode is cached, as it is for the launcher (even
+    # with PYTHONDONTWRITEBYTECODE set here)
+    py_compile.compile(os.path.join(root, 'main.py'))
+
+    interpreter, imports, first_frames = [], [], []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        interpreter.append((time.perf_counter() - started) * 1e3)
+        output = subprocess.run([sys.executable, '-c', script], check=True,
+                                capture_output=True, text=True).stdout
+        import_ms, frame_ms = map(float, output.split())
+        imports.append(import_ms)
+        first_frames.append(frame_ms)
+
+    with open(os.path.join(root, 'main.py')) as f:
+        source = f.read()
+    started = time.perf_counter()
+    compile(source, 'main.py', 'exec')
+    compile_ms = (time.perf_counter() - started) * 1e3
+
+    results = {
+        'interpreter_ms': median(interpreter),
+        'import_ms': median(imports),
+        'first_frame_ms': median(first_frames),
+        'compile_ms': compile_ms,
+    }
+    results['time_to_first_frame_ms'] = (results['interpreter_ms'] + results['import_ms']
+                                         + results['first_frame_ms'])
+    return results
+
+def run_startup(args):
+    results = measure_startup(args.runs)
+    print(f"interpreter start  {results['interpreter_ms']:7.1f} ms")
+    print(f"import main        {results['import_ms']:7.1f} ms")
+    print(f"ClockApp + frame   {results['first_frame_ms']:7.1f} ms")
+    print(f"time to first frame{results['time_to_first_frame_ms']:7.1f} ms "
+          f"(+{results['compile_ms']:.1f} ms to compile main.py when run as a script)")
+
+    status = 0
+    if results['time_to_first_frame_ms'] > args.budget:
+        print(f"FAIL: time to first frame over the {args.budget:.0f} ms budget")
+        status = 1
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        for field in ('import_ms', 'first_frame_ms', 'time_to_first_frame_ms'):
+            old, new = baseline.get(field), results[field]
+            # 1 ms of slack: process startup jitters more than that
+            if old is not None and new > old * (1 + args.threshold) + 1:
+                print(f"REGRESSION {field}: {old:.1f} -> {new:.1f} ms")
+                status = 1
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    return status
+
+def key_arrivals(rate, duration, burst):
+    """Arrival times of held-arrow repeats at rate per second, plus a pasted burst halfway"""
+    arrivals = [i / rate for i in range(int(rate * duration))]
+    arrivals += [duration / 2] * burst
+    return sorted(arrivals)
+
+def bench_latency(arrivals, bandwidth):
+    """Run the UI loop's input and draw passes against keys arriving at the given times
+
+    Time is simulated: each pass costs its measured CPU time plus the bytes it
+    sends at bandwidth bytes per second, and an idle loop sleeps until the next
+    key or tick. Returns the keypress-to-screen latency of every key in seconds,
+    the number of frames drawn and whether the selection ended up where the
+    keys put it.
+    """
+    terminal = FakeTerminal()
+    app = make_app(terminal.stdscr)
+    app.menu_open = True
+    app.display_clock()
+
+    keys = terminal.stdscr.keys
+    now, queued, shown, latencies, frames = 0.0, 0, 0, [], 0
+    while shown < len(arrivals):
+        if not keys and arrivals[queued] > now:
+            # Nothing to read: sleep until the next key, or draw the next tick first
+            tick = main.TickScheduler.next_tick(START_TIME + now) - START_TIME
+            now = min(arrivals[queued], tick)
+        # Keys that have arrived by now are waiting to be read
+        while queued < len(arrivals) and arrivals[queued] <= now:
+            keys.append(curses.KEY_DOWN)
+            queued += 1
+        app.time_source.simulated = START_TIME + now
+
+        flushed = terminal.flushed_bytes
+        started = time.perf_counter()
+        app.handle_input()
+        app.display_clock()
+        now += time.perf_counter() - started + (terminal.flushed_bytes - flushed) / bandwidth
+        frames += 1
+
+        # Every key read this pass is on screen once the frame is out
+        read = queued - len(keys)
+        latencies += [now - arrivals[i] for i in range(shown, read)]
+        shown = read
+    return latencies, frames, app.selected_menu_item == len(arrivals) % len(app.menu_items)
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def run_latency(args):
+    arrivals = key_arrivals(args.rate, args.duration, args.burst)
+    status = 0
+    # One key per pass is how the loop used to read input, for comparison
+    for name, batch in (('batched', main.INPUT_BATCH), ('one key per pass', 1)):
+        with fake_terminal(), mock.patch.object(main, 'INPUT_BATCH', batch):
+            latencies, frames, correct = bench_latency(arrivals, args.bandwidth)
+        print(f"{name:17} {len(latencies)} keys, {frames} frames, "
+              f"latency p50 {percentile(latencies, 0.5) * 1e3:7.2f} ms  "
+              f"p99 {percentile(latencies, 0.99) * 1e3:7.2f} ms  "
+              f"max {max(latencies) * 1e3:7.2f} ms")
+        if batch == 1:
+            continue
+        if not correct:
+            print("FAIL: the menu selection doesn't match the keys pressed")
+            status = 1
+        if max(latencies) * 1e3 > args.max_latency:
+            print(f"FAIL: keypress-to-screen latency over {args.max_latency:.0f} ms")
+            status = 1
+    return status
+
+def bench_timer(font, countdown, fps, seconds):
+    """CPU time and output of a running stopwatch or countdown at fps frames a second
+
+    The timer runs on a simulated monotonic clock stepped one frame at a
+    time, so the result is the drawing cost alone. Returns the CPU seconds
+    used per second of timer, the median glyph writes per frame and the
+    bytes per second sent to the terminal.
+    """
+    terminal = FakeTerminal()
+    app = make_app(terminal.stdscr, font=font)
+    monotonic = [0.0]
+    app.timer = main.Timer(3600 if countdown else None, clock=lambda: monotonic[0])
+    app.timer.toggle()
+    app.display_clock()
+
+    frames = int(fps * seconds)
+    writes = []
+    terminal.flushed_bytes = 0
+    started = time.process_time()
+    for _ in range(frames):
+        monotonic[0] += 1 / fps
+        app.time_source.advance(1 / fps)
+        app.display_clock()
+        writes.append(app.renderer.writes)
+    cpu = time.process_time() - started
+    return {
+        'cpu_fraction': cpu / seconds,
+        'writes_per_frame': median(writes),
+        'bytes_per_s': terminal.flushed_bytes / seconds,
+    }
+
+def run_timer(args):
+    status = 0
+    for font in range(len(main.FONTS)):
+        for countdown in (False, True):
+            with fake_terminal():
+                result = bench_timer(font, countdown, args.fps, args.seconds)
+            name = f"font{font}-{'countdown' if countdown else 'stopwatch'}"
+            print(f"{name:16} {result['cpu_fraction'] * 100:6.2f}% CPU at {args.fps:g} FPS  "
+                  f"{result['writes_per_frame']:4.0f} writes/frame  {result['bytes_per_s']:8.0f} B/s")
+            if result['cpu_fraction'] > args.max_cpu:
+                print(f"FAIL: {name} uses more than {args.max_cpu * 100:g}% of a CPU")
+                status = 1
+    return status
+
+def roster(entries, seed=0):
+    """alarms.json entries like a shift roster: daily alarms, one-offs and reminders"""
+    rng = random.Random(seed)
+    result = []
+    for i in range(entries):
+        at = f"{rng.randrange(24):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}"
+        kind = rng.random()
+        if kind < 0.6:
+            result.append({"at": at, "label": f"Shift {i}"})
+        elif kind < 0.9:
+            result.append({"at": at, "date": "2026-01-01", "label": f"Handover {i}"})
+        else:
+            result.append({"every": f"{rng.randrange(5, 240)}m", "from": at[:5], "label": f"Check {i}"})
+    return result
+
+def simulate_alarms(schedule, start, seconds):
+    """Run the UI loop's wakeups over simulated time: sleep until the next tick or
+    alarm, then fire what is due. Returns the alarms fired, their worst lateness
+    in seconds, the reminders that fired before their "from" time of day and
+    the mean cost in microseconds of a wakeup with nothing due, which is what
+    every tick pays."""
+    now, end = start, start + seconds
+    fired, late, early, checks, elapsed = 0, 0.0, 0, 0, 0.0
+    while now < end:
+        started = time.perf_counter()
+        due = schedule.pop_due(now)
+        deadline = main.TickScheduler.next_tick(now)
+        next_due = schedule.next_due()
+        if next_due is not None:
+            deadline = min(deadline, next_due)
+        if not due:
+            elapsed += time.perf_counter() - started
+            checks += 1
+        fired += len(due)
+        late = max([late] + [now - when for when, _ in due])
+        for when, alarm in due:
+            local = time.localtime(when)
+            if alarm.period is not None and local.tm_hour * 3600 + local.tm_min * 60 + local.tm_sec < alarm.anchor:
+                early += 1
+        now = deadline
+    return fired, late, early, elapsed / checks * 1e6
+
+def expected_firings(alarms, start, seconds):
+    """Firings in the window, counted alarm by alarm without the heap"""
+    count = 0
+    for alarm in alarms:
+        when = main.next_alarm_time(alarm, start)
+        while when is not None and when < start + seconds:
+            count += 1
+            when = main.next_alarm_time(alarm, when)
+    return count
+
+def measure_alarm_wakeup(delays=(0.5, 1.0, 1.5)):
+    """Real-time lateness of alarms fired by a TickScheduler-driven loop, in seconds"""
+    start = time.time()
+    alarms = [main.Alarm(f"in {delay}s", None, start + delay, None, None) for delay in delays]
+    schedule = main.AlarmSchedule(alarms, start)
+    read_fd, write_fd = os.pipe()  # Stands in for the terminal; never readable
+    scheduler = main.TickScheduler(read_fd)
+    late = []
+    while len(schedule):
+        scheduler.wait(min(scheduler.next_tick(time.time()), schedule.next_due()))
+        now = time.time()
+        late += [now - when for when, _ in schedule.pop_due(now)]
+    os.close(read_fd)
+    os.close(write_fd)
+    return max(late)
+
+def run_alarms(args):
+    status = 0
+    day = 24 * 3600
+    per_check = {}
+    for entries in sorted({10, args.entries}):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'alarms.json')
+            with open(path, 'w') as f:
+                json.dump(roster(entries), f)
+            started = time.perf_counter()
+            schedule = main.AlarmSchedule.load(START_TIME, path)
+            load_ms = (time.perf_counter() - started) * 1e3
+        alarms = [alarm for _, _, alarm in sorted(schedule.heap, key=lambda item: item[1])]
+        fired, late, early, check_us = simulate_alarms(schedule, START_TIME, day)
+        expected = expected_firings(alarms, START_TIME, day)
+        per_check[entries] = check_us
+        print(f"{entries:6} alarms: load {load_ms:7.1f} ms, {fired} fired over a day "
+              f"({expected} expected), {check_us:5.2f} us per idle tick, worst lateness {late:.3f} s")
+        if fired != expected or late > 0:
+            print("FAIL: alarms fired late or the wrong number of times")
+            status = 1
+        if early:
+            print(f"FAIL: {early} reminders fired before their start time")
+            status = 1
+
+    if per_check[args.entries] > per_check[10] * args.max_slowdown:
+        print("FAIL: the per-tick check grows with the number of alarms")
+        status = 1
+
+    late = measure_alarm_wakeup()
+    print(f"real-time wakeups: worst {late * 1e3:.1f} ms after the alarm's time")
+    if late > 1.0:
+        print("FAIL: an alarm fired more than a second late")
+        status = 1
+    return status
+
+# Hand edits of config.json that must not crash anything reading it: wrong
+# types, numbers out of range and true/false where a number belongs
+BAD_CONFIGS = [
+    {"current_font": "2"},
+    {"current_font": 1.5},
+    {"current_font": 99},
+    {"current_color": True},
+    {"current_color": -1},
+    {"date_format": 7},
+    {"show_seconds": "yes"},
+    {"time_format_12hour": None},
+    {"timer_frame_rate": "fast"},
+    {"countdown_seconds": 0},
+    {"dashboard_clocks": {"label": "London"}},
+]
+
+def check_config(bad):
+    """Run every reader of config.json on a config with bad values; returns the errors"""
+    errors = []
+
+    def attempt(name, func):
+        try:
+            func()
+        except Exception as e:
+            errors.append(f"{name}: {type(e).__name__}: {e}")
+
+    def write(config):
+        main.write_json_atomic(main.CONFIG_FILE, config)
+
+    def loaded():
+        config = main.load_config()
+        invalid = [key for key in main.DEFAULT_CONFIG if not main.valid_setting(key, config[key])]
+        if invalid:
+            raise ValueError(f"load_config() returned invalid {', '.join(invalid)}")
+
+    def stop_sleeping(seconds):
+        raise KeyboardInterrupt  # simple_clock's way out after its first frame
+
+    def simple():
+        with mock.patch.object(sys, 'stdout', io.TextIOWrapper(io.BytesIO())), \
+                mock.patch.object(time, 'sleep', stop_sleeping):
+            main.simple_clock()
+
+    def exported():
+        with tempfile.TemporaryDirectory() as temp_dir, contextlib.redirect_stdout(io.StringIO()):
+            args = argparse.Namespace(export=os.path.join(temp_dir, 'out.cast'), format='asciicast',
+                                      start='12:00', duration='3s', font=None, color=None)
+            if main.export(args):
+                raise RuntimeError("export failed")
+
+    def reloaded():
+        # A running clock picks up the bad edit and keeps going
+        write(main.DEFAULT_CONFIG)
+        app = main.ClockApp(FakeTerminal().stdscr)
+        app.display_clock()
+        write(dict(main.DEFAULT_CONFIG, **bad))
+        app.settings.file_state = None  # Don't depend on the mtime changing
+        app.next_config_check = 0
+        app.check_config_file()
+        app.display_clock()
+
+    write(dict(main.DEFAULT_CONFIG, **bad))
+    attempt("load_config", loaded)
+    attempt("ClockApp", lambda: main.ClockApp(FakeTerminal().stdscr).display_clock())
+    attempt("ClockServer", lambda: main.ClockServer(main.load_config(), main.FakeTimeSource(START_TIME)).tick())
+    attempt("simple_clock", simple)
+    attempt("export", exported)
+    attempt("reload", reloaded)
+    return errors
+
+def run_config(args):
+    status = 0
+    with fake_terminal():
+        for bad in BAD_CONFIGS:
+            errors = check_config(bad)
+            print(f"{json.dumps(bad):45} {'ok' if not errors else 'FAIL'}")
+            for error in errors:
+                print(f"    {error}")
+                status = 1
+    return status
+
+# Time formats a FrameTable can be built for: (show_seconds, twelve_hour, show_ampm)
+TIME_FORMATS = [(seconds, twelve_hour, ampm) for seconds in (True, False)
+                for twelve_hour, ampm in ((False, False), (True, False), (True, True))]
+
+def check_frame_table(font, show_seconds, twelve_hour, ampm, step):
+    """Time strings whose frame in the saved table differs from GLYPH_CACHE's
+
+    The table is built and saved by the first FrameTable.cached() call and
+    must come back memory-mapped from the second.
+    """
+    main.FrameTable.cached(font, show_seconds, twelve_hour, ampm)
+    table = main.FrameTable.cached(font, show_seconds, twelve_hour, ampm)
+    if table is None or not isinstance(table.data, mmap.mmap):
+        return ["(table was not loaded from disk)"]
+    mismatches = []
+    for index in range(0, len(table), step):
+        hour, minute, second = index // 3600, index // 60 % 60, index % 60
+        if not show_seconds:
+            hour, minute, second = index // 60, index % 60, 0
+        local = time.struct_time((2026, 1, 1, hour, minute, second, 3, 1, -1))
+        time_str = main.format_time(local, show_seconds, twelve_hour, ampm)
+        rows = main.GLYPH_CACHE.render(font, time_str, twelve_hour, ampm).rows
+        if table.rows(table.index(local)) != tuple(row.ljust(table.stride) for row in rows):
+            mismatches.append(time_str)
+    return mismatches
+
+# Export lengths measured in separate processes: just under the frame table
+# threshold, just over it (building the table, then mapping it) and a day
+EXPORT_DURATIONS = ['59m', '1h', '1h', '24h']
+
+# Runs a command and prints its seconds and peak RSS in MB; a small process of
+# its own, as a child forked straight from the bench would count the bench's
+# memory as its own peak
+EXPORT_SCRIPT = """
+import resource, subprocess, sys, time
+started = time.perf_counter()
+subprocess.run(sys.argv[1:], check=True, stdout=subprocess.DEVNULL)
+print(time.perf_counter() - started, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024)
+"""
+
+def measure_export(duration, cache_dir):
+    """Seconds and peak RSS in MB of a --export process"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    command = [sys.executable, os.path.join(root, 'main.py'), '--export', os.devnull,
+               '--start', '00:00', '--duration', duration, '--font', 'Original']
+    output = subprocess.run([sys.executable, '-c', EXPORT_SCRIPT] + command, check=True,
+                            capture_output=True, text=True,
+                            env=dict(os.environ, XDG_CACHE_HOME=cache_dir)).stdout
+    seconds, peak = map(float, output.split())
+    return seconds, peak
+
+def run_export(args):
+    status = 0
+    with tempfile.TemporaryDirectory() as cache_dir:
+        peaks = []
+        for duration in EXPORT_DURATIONS:
+            seconds, peak = measure_export(duration, cache_dir)
+            peaks.append(peak)
+            print(f"--export --duration {duration:4} {seconds:6.2f}s  peak RSS {peak:6.1f} MB")
+        if max(peaks) - peaks[0] > args.max_rss_growth:
+            print(f"FAIL: peak RSS grew by {max(peaks) - peaks[0]:.1f} MB "
+                  f"(limit {args.max_rss_growth:.0f} MB)")
+            status = 1
+    print()
+    with tempfile.TemporaryDirectory() as directory, \
+            mock.patch.object(main, 'FRAME_TABLE_DIR', directory):
+        for font, name in enumerate(main.FONT_REGISTRY.names()):
+            for show_seconds, twelve_hour, ampm in TIME_FORMATS:
+                started = time.perf_counter()
+                mismatches = check_frame_table(font, show_seconds, twelve_hour, ampm, args.step)
+                label = f"{name} {'12h' if twelve_hour else '24h'}{' AM/PM' if ampm else ''}" \
+                        f"{' seconds' if show_seconds else ''}"
+                print(f"{label:28} {'ok' if not mismatches else 'FAIL'} "
+                      f"({time.perf_counter() - started:.1f}s)")
+                if mismatches:
+                    print(f"    {len(mismatches)} frames differ, e.g. {', '.join(mismatches[:5])}")
+                    status = 1
+    return status
+
+class ReleaseServer(http.server.ThreadingHTTPServer):
+    """A stand-in for the GitHub API and the release downloads on localhost
+
+    Serves the release JSON with an ETag, the zipball (honouring Range
+    requests) and its checksum, and logs every request as (path, Range or
+    If-None-Match header, status, body bytes sent). cut_after makes the next
+    zipball response stop after that many bytes; ranges = False makes the
+    server ignore Range headers, as some do.
+    """
+
+    ETAG = '"release-1"'
+
+    def __init__(self, zipball, checksum):
+        super().__init__(('127.0.0.1', 0), ReleaseHandler)
+        self.daemon_threads = True
+        self.zipball = zipball
+        self.base = f"http://127.0.0.1:{self.server_address[1]}"
+        self.release = json.dumps({
+            "tag_name": "v9.9.9",
+            "html_url": f"{self.base}/release",
+            "zipball_url": f"{self.base}/zipball",
+            "assets": [{"name": "main.py.sha256", "browser_download_url": f"{self.base}/main.py.sha256"}],
+        }).encode()
+        self.checksum = checksum.encode()
+        self.cut_after = None
+        self.ranges = True
+        self.log = []
+
+class ReleaseHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass  # The bench prints its own summary
+
+    def do_GET(self):
+        server = self.server
+        if self.path == '/release':
+            if self.headers.get('If-None-Match') == server.ETAG:
+                return self.reply(304, b'', {'ETag': server.ETAG})
+            return self.reply(200, server.release, {'ETag': server.ETAG})
+        if self.path == '/main.py.sha256':
+            return self.reply(200, server.checksum)
+        if self.path != '/zipball':
+            return self.reply(404, b'')
+
+        body, status, headers = server.zipball, 200, {}
+        requested = self.headers.get('Range', '')
+        if server.ranges and requested.startswith('bytes='):
+            start = int(requested[len('bytes='):].rstrip('-'))
+            if start >= len(body):
+                return self.reply(416, b'', {'Content-Range': f"bytes */{len(body)}"})
+            status, body = 206, body[start:]
+            headers = {'Content-Range': f"bytes {start}-{len(server.zipball) - 1}/{len(server.zipball)}"}
+        sent = body
+        if server.cut_after is not None:
+            sent, server.cut_after = body[:server.cut_after], None
+        self.reply(status, body, headers, sent)
+
+    def reply(self, status, body, headers=None, sent=None):
+        """Send a response announcing body, but only write sent (the whole body by default)"""
+        sent = body if sent is None else sent
+        self.server.log.append((self.path, self.headers.get('Range') or self.headers.get('If-None-Match'),
+                                status, len(sent)))
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(sent)
+        self.close_connection = True
+
+def release_zipball(source):
+    """A GitHub-style zipball holding source as main.py in one top-level directory"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+        archive.writestr('NotLoom-That-Clock-Sucks-0000000/main.py', source)
+    return buffer.getvalue()
+
+def check_update(server, directory):
+    """Run the revalidation, resume and auto_update steps; returns (step, problems) pairs"""
+    base, zipball, log = server.base, server.zipball, server.log
+    results = []
+
+    # The release JSON: fetched, revalidated with its ETag, then served from the cache
+    cache_file = os.path.join(directory, 'update_cache.json')
+    first = main.fetch_release_info(f"{base}/release", cache_file, ttl=0)
+    second = main.fetch_release_info(f"{base}/release", cache_file, ttl=0)
+    main.fetch_release_info(f"{base}/release", cache_file)
+    problems = []
+    if log != [('/release', None, 200, len(server.release)), ('/release', server.ETAG, 304, 0)]:
+        problems.append(f"requests were {log}")
+    if second != first:
+        problems.append("the 304 didn't return the cached release")
+    if [name for name in os.listdir(directory) if name.endswith('.tmp')]:
+        problems.append("the cache write left a temp file behind")
+    results.append(("ETag revalidation (200, 304, then cached)", problems))
+
+    def interrupted_download(path, cut):
+        server.cut_after = cut
+        try:
+            main.download_file(f"{base}/zipball", path)
+        except Exception:
+            pass
+        else:
+            return ["the cut download didn't fail"]
+        return []
+
+    def download_problems(path, expected_log):
+        problems = []
+        if log != expected_log:
+            problems.append(f"requests were {log}")
+        with open(path, 'rb') as f:
+            if f.read() != zipball:
+                problems.append("the downloaded file differs from the zipball")
+        return problems
+
+    # An interrupted download continues where it stopped
+    part, cut = os.path.join(directory, 'resume.zip.part'), len(zipball) // 3
+    log.clear()
+    problems = interrupted_download(part, cut)
+    main.download_file(f"{base}/zipball", part)
+    problems += download_problems(part, [('/zipball', None, 200, cut),
+                                         ('/zipball', f"bytes={cut}-", 206, len(zipball) - cut)])
+    results.append((f"Range resume ({cut} + {len(zipball) - cut} of {len(zipball)} B)", problems))
+
+    # A server that ignores Range sends the whole file again, which replaces the partial one
+    part = os.path.join(directory, 'norange.zip.part')
+    server.ranges = False
+    log.clear()
+    problems = interrupted_download(part, cut)
+    main.download_file(f"{base}/zipball", part)
+    server.ranges = True
+    problems += download_problems(part, [('/zipball', None, 200, cut),
+                                         ('/zipball', f"bytes={cut}-", 200, len(zipball))])
+    results.append(("server without Range support", problems))
+
+    # A partial file longer than the zipball can't be resumed and is started over
+    part = os.path.join(directory, 'stale.zip.part')
+    with open(part, 'wb') as f:
+        f.write(b'x' * (len(zipball) + 1))
+    log.clear()
+    main.download_file(f"{base}/zipball", part)
+    problems = download_problems(part, [('/zipball', f"bytes={len(zipball) + 1}-", 416, 0),
+                                        ('/zipball', None, 200, len(zipball))])
+    results.append(("stale partial file (416)", problems))
+
+    # auto_update cut off mid-download, then run again: resumes, verifies and installs
+    target = os.path.join(directory, 'main.py')
+    with open(target, 'w') as f:
+        f.write("print('old version')\n")
+    log.clear()
+    server.cut_after = cut
+    with mock.patch.object(main, '__file__', target), \
+            mock.patch.object(main, 'GITHUB_API_URL', f"{base}/release"), \
+            mock.patch.object(main, 'UPDATE_CACHE_FILE', os.path.join(directory, 'auto_cache.json')):
+        failed = main.auto_update()
+        updated = main.auto_update()
+    problems = []
+    if failed[0] or not updated[0]:
+        problems.append(f"auto_update returned {failed}, then {updated}")
+    zip_requests = [entry for entry in log if entry[0] == '/zipball']
+    if zip_requests != [('/zipball', None, 200, cut), ('/zipball', f"bytes={cut}-", 206, len(zipball) - cut)]:
+        problems.append(f"zipball requests were {zip_requests}")
+    with open(target, 'rb') as f:
+        if hashlib.sha256(f.read()).hexdigest() != server.checksum.decode():
+            problems.append("the installed main.py isn't the released one")
+    if [name for name in os.listdir(directory) if name.startswith('main.py.')]:
+        problems.append("the partial download was left behind")
+    results.append(("auto_update interrupted, then resumed", problems))
+    return results
+
+def run_update(args):
+    with open(main.__file__, 'rb') as f:
+        source = f.read()
+    server = ReleaseServer(release_zipball(source), hashlib.sha256(source).hexdigest())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    status = 0
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for step, problems in check_update(server, directory):
+                print(f"{step:48} {'ok' if not problems else 'FAIL'}")
+                for problem in problems:
+                    print(f"    {problem}")
+                    status = 1
+    finally:
+        server.shutdown()
+        server.server_close()
+    return status
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="That Clock Sucks benchmarks")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    render = commands.add_parser('render', help="per-frame cost of ClockApp.display_clock")
+    render.add_argument('--ticks', type=int, default=60, help="simulated ticks per scenario")
+    render.add_argument('--filter', help="only run scenarios whose name contains this")
+    render.add_argument('--save', metavar='FILE', help="save the results as a baseline")
+    render.add_argument('--compare', metavar='FILE', help="compare against a saved baseline")
+    render.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed slowdown before a scenario counts as a regression")
+    render.set_defaults(func=run_render)
+
+    dashboard = commands.add_parser('dashboard', help="per-tick cost of a dashboard of many clocks")
+    dashboard.add_argument('--clocks', type=int, default=60, help="timezone clocks on the dashboard")
+    dashboard.add_argument('--ticks', type=int, default=60, help="simulated seconds per scenario")
+    dashboard.add_argument('--max-tick-ms', type=float, default=50.0,
+                           help="fail if a tick takes longer than this many ms (ticks are a "
+                                "second apart, so this still leaves keys responsive)")
+    dashboard.set_defaults(func=run_dashboard)
+
+    serve = commands.add_parser('serve', help="clock server fan-out to many clients")
+    serve.add_argument('--clients', type=int, default=500, help="concurrent clients")
+    serve.add_argument('--ticks', type=int, default=30, help="frames sent to every client")
+    serve.add_argument('--max-tick-cpu', type=float, default=0.5,
+                       help="fail if a tick costs the server more CPU seconds than this")
+    serve.add_argument('--max-stall-ticks', type=int, default=5,
+                       help="fail if a client that stopped reading is sent more frames than this")
+    serve.set_defaults(func=run_serve)
+
+    startup = commands.add_parser('startup', help="import time and time to first frame")
+    startup.add_argument('--runs', type=int, default=10, help="processes started per measurement")
+    startup.add_argument('--budget', type=float, default=100.0,
+                         help="fail if the time to first frame is above this many ms")
+    startup.add_argument('--save', metavar='FILE', help="save the results as a baseline")
+    startup.add_argument('--compare', metavar='FILE', help="compare against a saved baseline")
+    startup.add_argument('--threshold', type=float, default=0.25,
+                         help="allowed slowdown before a phase counts as a regression")
+    startup.set_defaults(func=run_startup)
+
+    latency = commands.add_parser('latency', help="keypress-to-screen time under key repeat")
+    latency.add_argument('--rate', type=float, default=30.0, help="key repeats per second")
+    latency.add_argument('--duration', type=float, default=5.0, help="seconds the key is held")
+    latency.add_argument('--burst', type=int, default=2000,
+                         help="keys pasted at once halfway through")
+    latency.add_argument('--bandwidth', type=float, default=100000.0,
+                         help="terminal output in bytes per second (a slow SSH link by default)")
+    latency.add_argument('--max-latency', type=float, default=50.0,
+                         help="fail if any key takes longer than this many ms to show")
+    latency.set_defaults(func=run_latency)
+
+    timer = commands.add_parser('timer', help="CPU use of a running stopwatch or countdown")
+    timer.add_argument('--fps', type=float, default=60.0, help="frames drawn per second")
+    timer.add_argument('--seconds', type=float, default=10.0, help="simulated seconds per scenario")
+    timer.add_argument('--max-cpu', type=float, default=0.05,
+                       help="fail if drawing takes more than this fraction of a CPU")
+    timer.set_defaults(func=run_timer)
+
+    alarms = commands.add_parser('alarms', help="alarm schedule cost and firing accuracy")
+    alarms.add_argument('--entries', type=int, default=10000, help="alarms in the generated roster")
+    alarms.add_argument('--max-slowdown', type=float, default=3.0,
+                        help="fail if an idle tick with --entries alarms costs this many times "
+                             "more than with 10")
+    alarms.set_defaults(func=run_alarms)
+
+    config = commands.add_parser('config', help="malformed config.json values don't crash the clock")
+    config.set_defaults(func=run_config)
+
+    export = commands.add_parser('export', help="export memory use, saved frame tables match rendering")
+    export.add_argument('--step', type=int, default=1,
+                        help="check every this many frames of each table")
+    export.add_argument('--max-rss-growth', type=float, default=40.0,
+                        help="fail if a long export peaks this many MB above a 59m one")
+    export.set_defaults(func=run_export)
+
+    update = commands.add_parser('update', help="update check and download against a local server")
+    update.set_defaults(func=run_update)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
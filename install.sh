@@ -27,6 +27,11 @@ echo "Installing to $INSTALL_DIR..."
 cp main.py "$INSTALL_DIR/"
 cp clock-sucks "$INSTALL_DIR/"
 
+# Install the extra fonts where the clock looks for them
+FONT_DIR="${XDG_CONFIG_HOME:-$HOME/.config}/that-clock-sucks/fonts"
+mkdir -p "$FONT_DIR"
+cp fonts/*.font "$FONT_DIR/"
+
 # Check if INSTALL_DIR is in PATH
 if [[ ":$PATH:" != *":$INSTALL_DIR:"* ]]; then
     echo "Warning: $INSTALL_DIR is not in your PATH."
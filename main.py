@@ -1,45 +1,128 @@
 #!/usr/bin/env python3
 import curses
+import curses.panel
 import time
-from datetime import datetime
 import sys
 import os
+import select
+import signal
+import threading
+import queue
 import json
-import urllib.request
-import urllib.error
+import codecs
+import heapq
+from collections import Counter, OrderedDict, deque, namedtuple
+# Everything else (networking, zip files, asyncio, argparse...) is imported
+# where it's used, so starting the clock only loads what the first frame needs
 
 # Application version
 VERSION = "0.0.1"
 
 # Configuration file path
 CONFIG_FILE = os.path.join(os.path.dirname(__file__), 'config.json')
+# Alarms, reminders and chimes, see AlarmSchedule
+ALARMS_FILE = os.path.join(os.path.dirname(__file__), 'alarms.json')
 
 # GitHub repository information
 GITHUB_REPO = "NotLoom/That-Clock-Sucks"
 GITHUB_API_URL = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
+USER_AGENT = f"That-Clock-Sucks/{VERSION}"
+
+# Cached release JSON, how long it is trusted without asking GitHub, and
+# how long a network request may take before the check gives up
+UPDATE_CACHE_FILE = os.path.join(os.path.dirname(__file__), 'update_cache.json')
+UPDATE_CACHE_TTL = 3600
+UPDATE_CHECK_TIMEOUT = 10
+
+# Read size for streamed downloads, and release assets that may carry the
+# SHA-256 of main.py
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+CHECKSUM_ASSET_NAMES = ('main.py.sha256', 'SHA256SUMS', 'sha256sums.txt')
+
+# Settings stored in config.json and their defaults
+DEFAULT_CONFIG = {
+    "show_seconds": True,
+    "show_date": True,
+    "date_format": "%m/%d/%Y",
+    "show_menu_hint": True,
+    "current_font": 0,
+    "current_color": 0,
+    "time_format_12hour": False,
+    "show_ampm": True,
+    "auto_scale": False,
+    "dashboard": False,
+    # Frames per second drawn while the stopwatch or countdown runs (1-120)
+    "timer_frame_rate": 30,
+    "countdown_seconds": 300,
+    # Clocks shown in dashboard mode: [{"label": "London", "timezone": "Europe/London"}, ...]
+    "dashboard_clocks": []
+}
+
+# Type each config.json value must have; see sanitize_config
+SETTING_TYPES = {
+    "show_seconds": bool,
+    "show_date": bool,
+    "date_format": str,
+    "show_menu_hint": bool,
+    "current_font": int,
+    "current_color": int,
+    "time_format_12hour": bool,
+    "show_ampm": bool,
+    "auto_scale": bool,
+    "dashboard": bool,
+    "timer_frame_rate": (int, float),
+    "countdown_seconds": int,
+    "dashboard_clocks": list,
+}
+
+def valid_setting(key, value):
+    """Whether a config.json value has the right type and is in range
+
+    true/false don't count as numbers.
+    """
+    expected = SETTING_TYPES[key]
+    if not isinstance(value, expected) or (expected is not bool and isinstance(value, bool)):
+        return False
+    if key == "current_font":
+        return 0 <= value < len(FONT_REGISTRY)
+    if key == "current_color":
+        return 0 <= value < len(COLOR_NAMES)
+    if key == "timer_frame_rate":
+        return 1 <= value <= MAX_TIMER_FRAME_RATE
+    if key == "countdown_seconds":
+        return value > 0
+    return True
+
+def sanitize_config(config, fallback=DEFAULT_CONFIG):
+    """Return a copy of config in which every setting is present and valid
+
+    Missing or invalid values are taken from fallback: the defaults, or the
+    values in use when a running clock reloads config.json. Everything that
+    reads config.json goes through this, so a bad hand edit can't crash it.
+    """
+    config = dict(config)
+    for key in DEFAULT_CONFIG:
+        if key not in config or not valid_setting(key, config[key]):
+            config[key] = fallback[key]
+    config["dashboard_clocks"] = [entry for entry in config["dashboard_clocks"] if isinstance(entry, dict)]
+    return config
+
+# Seconds a changed setting waits before it is written, so rapid toggles
+# are coalesced into a single write
+CONFIG_SAVE_DELAY = 1.0
 
 def load_config():
     """Load user configuration from file"""
-    default_config = {
-        "show_seconds": True,
-        "show_date": True,
-        "date_format": "%m/%d/%Y",
-        "show_menu_hint": True,
-        "current_font": 0,
-        "current_color": 0,
-        "time_format_12hour": False,
-        "show_ampm": True
-    }
+    default_config = dict(DEFAULT_CONFIG)
     
     try:
         if os.path.exists(CONFIG_FILE):
             with open(CONFIG_FILE, 'r') as f:
                 config = json.load(f)
-                # Merge with default config to ensure all keys are present
-                for key, value in default_config.items():
-                    if key not in config:
-                        config[key] = value
-                return config
+            if not isinstance(config, dict):
+                return default_config
+            # Fill in missing keys and replace values of the wrong type or out of range
+            return sanitize_config(config)
         else:
             # Create config file with default settings
             save_config(default_config)
@@ -48,27 +131,192 @@ def load_config():
         # If there's any error, return default config
         return default_config
 
+def stat_file(path):
+    """Identify the current version of a file without reading it; None if it doesn't exist"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+def fsync_directory(path):
+    """Make a rename into the directory holding path durable; best effort"""
+    try:
+        dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except OSError:
+        pass
+
+def write_json_atomic(path, data):
+    """Write JSON through a temp file, fsync and rename so the file is never left half written"""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    fsync_directory(path)
+
 def save_config(config):
     """Save user configuration to file"""
     try:
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=2)
+        write_json_atomic(CONFIG_FILE, config)
     except Exception as e:
         # Silently fail if we can't save config
         pass
 
-def check_for_updates():
-    """Check for updates from GitHub"""
+class Settings:
+    """User configuration with per-field dirty tracking and debounced saving
+
+    Changing a value only marks it dirty; the file is written once the
+    first change is CONFIG_SAVE_DELAY old (see flush_due) or on flush().
+    """
+
+    def __init__(self, values, delay=CONFIG_SAVE_DELAY):
+        self.values = dict(values)
+        self.delay = delay
+        self.dirty = set()
+        self.save_at = None  # When pending changes are due to be written
+        self.file_state = stat_file(CONFIG_FILE)  # config.json as we last read or wrote it
+
+    @classmethod
+    def load(cls):
+        """Create the settings from config.json"""
+        return cls(load_config())
+
+    def reload_if_changed(self):
+        """Pick up edits made to config.json by someone else
+
+        Costs one stat() when nothing changed. Values with unsaved local
+        changes win over the file. Returns the set of keys whose value changed.
+        """
+        state = stat_file(CONFIG_FILE)
+        if state is None or state == self.file_state:
+            return set()
+        try:
+            with open(CONFIG_FILE, 'r') as f:
+                config = json.load(f)
+        except (OSError, ValueError):
+            return set()  # Probably caught mid-write, try again next tick
+        self.file_state = state
+        if not isinstance(config, dict):
+            return set()
+        # Invalid values keep the ones we have rather than crash on them
+        config = sanitize_config(config, self.values)
+
+        changed = set()
+        for key in DEFAULT_CONFIG:
+            value = config[key]
+            if key not in self.dirty and self.values.get(key) != value:
+                self.values[key] = value
+                changed.add(key)
+        return changed
+
+    def __getitem__(self, key):
+        return self.values[key]
+
+    def set(self, key, value):
+        """Change a setting and schedule a save if it actually changed"""
+        if self.values.get(key) == value:
+            return
+        self.values[key] = value
+        self.dirty.add(key)
+        if self.save_at is None:
+            self.save_at = time.time() + self.delay
+
+    def as_dict(self):
+        """A copy of all settings, as stored in config.json"""
+        return dict(self.values)
+
+    def flush_due(self, now):
+        """Write pending changes if their debounce delay has passed"""
+        if self.save_at is not None and now >= self.save_at:
+            self.flush()
+
+    def flush(self):
+        """Write pending changes now"""
+        if self.dirty:
+            save_config(self.as_dict())
+            # Our own write is not an external edit
+            self.file_state = stat_file(CONFIG_FILE)
+        self.dirty.clear()
+        self.save_at = None
+
+class SettingAttribute:
+    """ClockApp attribute backed by a key of the app's Settings"""
+
+    def __init__(self, key):
+        self.key = key
+
+    def __get__(self, app, owner=None):
+        if app is None:
+            return self
+        return app.settings[self.key]
+
+    def __set__(self, app, value):
+        app.settings.set(self.key, value)
+
+def fetch_release_info(url=None, cache_file=None, timeout=None, ttl=None):
+    """Return the latest release JSON, using the on-disk cache when possible
+
+    A cached response younger than the TTL is returned without touching the
+    network. Older entries are revalidated with If-None-Match, so an
+    unchanged release costs a 304 instead of the full JSON.
+    """
+    import urllib.request
+    import urllib.error
+
+    url = url or GITHUB_API_URL
+    cache_file = cache_file or UPDATE_CACHE_FILE
+    timeout = UPDATE_CHECK_TIMEOUT if timeout is None else timeout
+    ttl = UPDATE_CACHE_TTL if ttl is None else ttl
+
+    cache = None
     try:
-        # Create request with proper headers
-        request = urllib.request.Request(
-            GITHUB_API_URL,
-            headers={'User-Agent': 'That-Clock-Sucks/0.0.1'}
-        )
-        
-        # Make the request
-        with urllib.request.urlopen(request) as response:
+        with open(cache_file, 'r') as f:
+            cache = json.load(f)
+        if cache.get('url') != url:
+            cache = None
+    except (OSError, ValueError):
+        pass
+
+    now = time.time()
+    if cache and now - cache.get('fetched_at', 0) < ttl:
+        return cache['data']
+
+    headers = {'User-Agent': USER_AGENT}
+    if cache and cache.get('etag'):
+        headers['If-None-Match'] = cache['etag']
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
             data = json.loads(response.read().decode())
+            etag = response.headers.get('ETag')
+    except urllib.error.HTTPError as e:
+        if e.code != 304 or not cache:
+            raise
+        # Not modified, the cached release is still current
+        data = cache['data']
+        etag = e.headers.get('ETag') or cache.get('etag')
+
+    try:
+        write_json_atomic(cache_file, {'url': url, 'etag': etag, 'fetched_at': now, 'data': data})
+    except OSError:
+        pass  # The cache is only an optimization
+    return data
+
+def check_for_updates(url=None, cache_file=None, timeout=None):
+    """Check for updates from GitHub"""
+    try:
+        data = fetch_release_info(url, cache_file, timeout)
             
         # Extract version information
         latest_version = data.get('tag_name', 'unknown').lstrip('v')  # Remove 'v' prefix if present
@@ -87,17 +335,124 @@ def check_for_updates():
             'error': str(e)
         }
 
-def auto_update():
-    """Automatically download and install the latest version"""
+def download_file(url, path, progress=None, timeout=None):
+    """Stream url into path in chunks, resuming from a partial file if one exists
+
+    progress(done, total) is called after every chunk; total is None when the
+    server doesn't say how big the file is.
+    """
+    import urllib.request
+    import urllib.error
+
+    timeout = UPDATE_CHECK_TIMEOUT if timeout is None else timeout
+    offset = os.path.getsize(path) if os.path.exists(path) else 0
+    headers = {'User-Agent': USER_AGENT}
+    if offset:
+        headers['Range'] = f'bytes={offset}-'
+
     try:
-        # Get the latest release information
-        request = urllib.request.Request(
-            GITHUB_API_URL,
-            headers={'User-Agent': 'That-Clock-Sucks/0.0.1'}
-        )
-        
-        with urllib.request.urlopen(request) as response:
-            data = json.loads(response.read().decode())
+        response = urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout)
+    except urllib.error.HTTPError as e:
+        if e.code != 416 or not offset:
+            raise
+        # The partial file doesn't match what the server has, start over
+        os.remove(path)
+        return download_file(url, path, progress, timeout)
+
+    with response:
+        if offset and response.status != 206:
+            offset = 0  # Server ignored the range and sent the whole file
+        length = response.headers.get('Content-Length')
+        total = offset + int(length) if length and length.isdigit() else None
+        done = offset
+        with open(path, 'ab' if offset else 'wb') as f:
+            while True:
+                chunk = response.read(DOWNLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                f.write(chunk)
+                done += len(chunk)
+                if progress:
+                    progress(done, total)
+    if total is not None and done != total:
+        raise IOError(f"download incomplete ({done} of {total} bytes)")
+
+def fetch_expected_checksum(release):
+    """Return the SHA-256 of main.py published with the release, or None if there isn't one"""
+    import urllib.request
+
+    for asset in release.get('assets', []):
+        if asset.get('name') not in CHECKSUM_ASSET_NAMES:
+            continue
+        request = urllib.request.Request(asset['browser_download_url'], headers={'User-Agent': USER_AGENT})
+        with urllib.request.urlopen(request, timeout=UPDATE_CHECK_TIMEOUT) as response:
+            text = response.read(64 * 1024).decode()
+        # Either a bare digest or "<digest>  <file name>" lines (sha256sum format)
+        for line in text.splitlines():
+            fields = line.split()
+            if len(fields) == 1 or (len(fields) == 2 and fields[1].lstrip('*').endswith('main.py')):
+                return fields[0].lower()
+    return None
+
+def find_main_py(archive):
+    """Return the zip member holding main.py (zipballs wrap everything in one top-level directory)"""
+    for info in archive.infolist():
+        parts = info.filename.split('/')
+        if parts[-1] == 'main.py' and len(parts) <= 2 and not info.is_dir():
+            return info
+    return None
+
+def install_main_py(zip_path, target, expected_sha256=None):
+    """Stream main.py out of the archive, verify it and atomically replace target"""
+    import hashlib
+    import tempfile
+    import zipfile
+
+    with zipfile.ZipFile(zip_path, 'r') as archive:
+        member = find_main_py(archive)
+        if member is None:
+            raise IOError("New main.py not found in update")
+
+        # Write next to the target so os.replace is an atomic rename
+        fd, temp_path = tempfile.mkstemp(prefix='.main.py.', suffix='.tmp',
+                                         dir=os.path.dirname(target))
+        try:
+            digest = hashlib.sha256()
+            # Reading the member to the end also checks the zip's CRC-32
+            with archive.open(member) as src, os.fdopen(fd, 'wb') as dst:
+                while True:
+                    chunk = src.read(DOWNLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    dst.write(chunk)
+                dst.flush()
+                os.fsync(dst.fileno())
+
+            if expected_sha256 and digest.hexdigest() != expected_sha256:
+                raise IOError("checksum mismatch")
+            # Never install something that isn't even valid Python
+            with open(temp_path, 'rb') as f:
+                compile(f.read(), target, 'exec')
+
+            os.chmod(temp_path, os.stat(target).st_mode & 0o7777)
+            os.replace(temp_path, target)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    fsync_directory(target)
+
+def auto_update(progress=None):
+    """Automatically download and install the latest version
+
+    progress(message) is called with short status text while downloading.
+    """
+    try:
+        # Get the latest release information (usually fresh in the cache
+        # from the check that came just before)
+        data = fetch_release_info()
         
         # Get the download URL for the zipball
         zipball_url = data.get('zipball_url', '')
@@ -109,33 +464,36 @@ def auto_update():
         # Get the current script path
         current_script = os.path.abspath(__file__)
         
-        # Download the zipball to a temporary location
-        temp_zip = current_script + '.zip.tmp'
-        urllib.request.urlretrieve(zipball_url, temp_zip)
-        
-        # Extract the zipball to a temporary directory
-        import tempfile
-        import zipfile
-        import shutil
+        # Download the zipball next to the script; the name includes the
+        # release so an interrupted download of the same release is resumed
+        partial_zip = f"{current_script}.{release_tag or 'latest'}.zip.part"
+        last_percent = [None]
+
+        def report(done, total):
+            if not progress:
+                return
+            if total:
+                percent = done * 100 // total
+                if percent != last_percent[0]:
+                    last_percent[0] = percent
+                    progress(f"Downloading {percent}%")
+            else:
+                progress(f"Downloading {done // 1024} KiB")
+
+        download_file(zipball_url, partial_zip, report)
         
-        with tempfile.TemporaryDirectory() as temp_dir:
-            with zipfile.ZipFile(temp_zip, 'r') as zip_ref:
-                zip_ref.extractall(temp_dir)
-            
-            # Find the extracted directory (it will be the only item)
-            extracted_dir = os.path.join(temp_dir, os.listdir(temp_dir)[0])
-            
-            # Look for main.py in the extracted directory
-            new_main_py = os.path.join(extracted_dir, 'main.py')
-            
-            if not os.path.exists(new_main_py):
-                return False, "New main.py not found in update"
-            
-            # Replace the current main.py with the new one
-            shutil.copy2(new_main_py, current_script)
+        if progress:
+            progress("Verifying update...")
+        expected = fetch_expected_checksum(data)
+        try:
+            install_main_py(partial_zip, current_script, expected)
+        except Exception:
+            # A corrupt archive can't be resumed into a good one
+            os.remove(partial_zip)
+            raise
         
         # Clean up temporary files
-        os.remove(temp_zip)
+        os.remove(partial_zip)
         
         return True, f"Updated to version {release_tag}"
         
@@ -157,6 +515,7 @@ FONTS = [
         '8': [' ███ ', '█   █', ' ███ ', '█   █', ' ███ '],
         '9': [' ███ ', '█   █', ' ████', '    █', ' ███ '],
         ':': ['     ', '  █  ', '     ', '  █  ', '     '],
+        '.': ['     ', '     ', '     ', '     ', '  █  '],
         'A': [' ███ ', '█   █', '█████', '█   █', '█   █'],
         'M': ['█   █', '██ ██', '█ █ █', '█   █', '█   █'],
         'P': ['████ ', '█   █', '████ ', '█    ', '█    ']
@@ -174,6 +533,7 @@ FONTS = [
         '8': ['█████', '█   █', '█████', '█   █', '█████'],
         '9': ['█████', '█   █', '█████', '    █', '█████'],
         ':': ['     ', '  ██ ', '     ', '  ██ ', '     '],
+        '.': ['     ', '     ', '     ', '     ', '  ██ '],
         'A': [' ███ ', '█   █', '█████', '█   █', '█   █'],
         'M': ['█   █', '██ ██', '█ █ █', '█   █', '█   █'],
         'P': ['████ ', '█   █', '████ ', '█    ', '█    ']
@@ -191,6 +551,7 @@ FONTS = [
         '8': [' ███ ', '█   █', ' ███ ', '█   █', ' ███ '],
         '9': [' ███ ', '█   █', '█████', '    █', ' ███ '],
         ':': ['  █  ', '  █  ', '     ', '  █  ', '  █  '],
+        '.': ['     ', '     ', '     ', '     ', '  █  '],
         'A': [' ███ ', '█   █', '█████', '█   █', '█   █'],
         'M': ['█   █', '██ ██', '█ █ █', '█   █', '█   █'],
         'P': ['█████', '█   █', '█████', '█    ', '█    ']
@@ -208,6 +569,7 @@ FONTS = [
         '8': [' ██', '█ █', ' ██', '█ █', ' ██'],
         '9': [' ██', '█ █', '███', '  █', ' ██'],
         ':': ['   ', ' █ ', '   ', ' █ ', '   '],
+        '.': ['   ', '   ', '   ', '   ', ' █ '],
         'A': [' ██ ', '█  █', '████', '█  █', '█  █'],
         'M': ['█  █', '██ ██', '█ █ █', '█  █', '█  █'],
         'P': ['███ ', '█  █', '███ ', '█   ', '█   ']
@@ -225,31 +587,1331 @@ FONTS = [
         '8': ['  █████  ', ' ██   ██ ', '  █████  ', ' ██   ██ ', '  █████  '],
         '9': ['  █████  ', ' ██   ██ ', '  ██████ ', '     ██  ', '  █████  '],
         ':': ['        ', '   ██   ', '        ', '   ██   ', '        '],
+        '.': ['        ', '        ', '        ', '        ', '   ██   '],
         'A': ['  █████  ', ' ██   ██ ', ' ███████ ', ' ██   ██ ', ' ██   ██ '],
         'M': [' ██   ██ ', ' ███ ███ ', ' ██ █ ██ ', ' ██   ██ ', ' ██   ██ '],
         'P': [' ██████  ', ' ██   ██ ', ' ██████  ', ' ██      ', ' ██      ']
     }
 ]
 
+# Display names of the built-in FONTS, in the same order
+BUILTIN_FONT_NAMES = ["Original", "Thick", "Thin", "Compact", "Wide"]
+
+# Extra fonts are .font files in these directories; their compiled form is
+# cached in FONT_CACHE_DIR
+FONT_DIRS = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts'),
+    os.path.join(os.environ.get('XDG_CONFIG_HOME') or os.path.expanduser('~/.config'),
+                 'that-clock-sucks', 'fonts'),
+]
+FONT_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+                              'that-clock-sucks', 'fonts')
+FONT_FILE_SUFFIX = '.font'
+FONT_HEIGHT = 5
+
+def parse_font_file(path):
+    """Parse a .font file into {char: (width, row bitmaps)}
+
+    The format is plain text. Outside a glyph, blank lines and lines starting
+    with '#' are comments; "glyph <char>" starts a glyph ("glyph space" for
+    ' ') and the next FONT_HEIGHT lines are its rows, '#' for a filled cell
+    and anything else for an empty one. Each row is stored as an integer whose
+    most significant bit is the leftmost cell.
+    """
+    glyphs = {}
+    char = None
+    rows = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.rstrip('\n')
+            if char is None:
+                if not line.strip() or line.startswith('#'):
+                    continue
+                keyword, _, name = line.partition(' ')
+                if keyword != 'glyph' or not name:
+                    raise ValueError(f"{path}:{number}: expected 'glyph <char>'")
+                char = ' ' if name == 'space' else name
+                if len(char) != 1:
+                    raise ValueError(f"{path}:{number}: glyph name must be one character")
+                rows = []
+                continue
+            rows.append(line)
+            if len(rows) == FONT_HEIGHT:
+                width = max(len(row) for row in rows)
+                bitmaps = tuple(int(''.join('1' if c == '#' else '0' for c in row.ljust(width)) or '0', 2)
+                                for row in rows)
+                glyphs[char] = (width, bitmaps)
+                char = None
+    if char is not None:
+        raise ValueError(f"{path}: glyph {char!r} has fewer than {FONT_HEIGHT} rows")
+    return glyphs
+
+def bitmap_to_rows(width, bitmaps):
+    """Expand a glyph bitmap into FONTS-style row strings"""
+    return [''.join('█' if bits >> (width - 1 - col) & 1 else ' ' for col in range(width))
+            for bits in bitmaps]
+
+def load_font_file(path):
+    """Load a .font file as a FONTS-style dict, going through the compiled cache
+
+    The compiled bitmaps are stored as JSON keyed by the source path and
+    reused until the source's mtime or size changes.
+    """
+    import hashlib
+
+    st = os.stat(path)
+    stamp = [st.st_mtime_ns, st.st_size]
+    cache_path = os.path.join(FONT_CACHE_DIR,
+                              hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:16] + '.json')
+    glyphs = None
+    try:
+        with open(cache_path, 'r') as f:
+            cached = json.load(f)
+        if cached.get('source') == os.path.abspath(path) and cached.get('stamp') == stamp:
+            glyphs = {char: (width, tuple(bitmaps)) for char, (width, bitmaps) in cached['glyphs'].items()}
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    if glyphs is None:
+        glyphs = parse_font_file(path)
+        try:
+            os.makedirs(FONT_CACHE_DIR, exist_ok=True)
+            write_json_atomic(cache_path, {'source': os.path.abspath(path), 'stamp': stamp,
+                                           'glyphs': {char: [width, list(bitmaps)]
+                                                      for char, (width, bitmaps) in glyphs.items()}})
+        except OSError:
+            pass  # The cache is only an optimization
+
+    return {char: bitmap_to_rows(width, bitmaps) for char, (width, bitmaps) in glyphs.items()}
+
+class FontRegistry:
+    """The built-in FONTS followed by any .font files, each loaded on first use
+
+    Listing the font directories only reads file names, so startup doesn't
+    pay for fonts that are never shown.
+    """
+
+    def __init__(self, builtin=FONTS, builtin_names=BUILTIN_FONT_NAMES, dirs=FONT_DIRS):
+        self.builtin = builtin
+        self.builtin_names = builtin_names
+        self.dirs = dirs
+        self.files = None  # [(name, path)], filled in by scan()
+        self.loaded = {}  # index -> font dict
+
+    def scan(self):
+        """Find the font files (without reading them)"""
+        files = {}
+        for directory in self.dirs:
+            try:
+                entries = sorted(os.listdir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.endswith(FONT_FILE_SUFFIX):
+                    name = entry[:-len(FONT_FILE_SUFFIX)].replace('_', ' ').title()
+                    files.setdefault(name, os.path.join(directory, entry))  # Earlier dirs win
+        self.files = sorted(files.items())
+        self.loaded = {}
+
+    def __len__(self):
+        if self.files is None:
+            self.scan()
+        return len(self.builtin) + len(self.files)
+
+    def names(self):
+        """Display names of every font, by index"""
+        if self.files is None:
+            self.scan()
+        return list(self.builtin_names) + [name for name, _ in self.files]
+
+    def get(self, index):
+        """Return a font as a FONTS-style dict; broken font files fall back to the first font"""
+        if index < len(self.builtin):
+            return self.builtin[index]
+        font = self.loaded.get(index)
+        if font is None:
+            if self.files is None:
+                self.scan()
+            try:
+                font = load_font_file(self.files[index - len(self.builtin)][1])
+            except (OSError, ValueError, IndexError):
+                font = self.builtin[0]
+            self.loaded[index] = font
+        return font
+
+FONT_REGISTRY = FontRegistry()
+
+def format_time(local, show_seconds=True, twelve_hour=False, show_ampm=True):
+    """Format a struct_time the way the clock displays it"""
+    if twelve_hour:
+        # 12-hour format
+        time_str = time.strftime('%I:%M:%S' if show_seconds else '%I:%M', local)
+        # Add AM/PM if enabled
+        if show_ampm:
+            time_str += ' ' + time.strftime('%p', local)  # Returns 'AM' or 'PM'
+        return time_str
+    # 24-hour format
+    return time.strftime('%H:%M:%S' if show_seconds else '%H:%M', local)
+
+class TimeSource:
+    """The clock as the display sees it: read once per tick, formatted only when it changes
+
+    tick() reads the clock; every other method works on that reading, so all
+    parts of a frame agree. The time string is cached until the next second
+    (or minute) and the date string until midnight, so a frame usually
+    formats nothing. Pass another clock function (or use FakeTimeSource) to
+    run the display on simulated time.
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.now = clock()
+        self._local = None
+        self._local_second = None
+        self._time_key = None
+        self._time_str = ''
+        self._date_format = None
+        self._date_str = ''
+        self._day = (0, 0)  # [start, end) of the day the cached date belongs to
+
+    def tick(self):
+        """Read the clock for a new frame and return the reading"""
+        self.now = self.clock()
+        return self.now
+
+    def local(self):
+        """struct_time of the current reading, converted once per second"""
+        second = int(self.now)
+        if second != self._local_second:
+            self._local = time.localtime(second)
+            self._local_second = second
+        return self._local
+
+    def time_str(self, show_seconds=True, twelve_hour=False, show_ampm=True):
+        """The time as format_time() shows it"""
+        # Zone offsets are whole minutes, so the local minute only changes
+        # when the minute number since the epoch does
+        second = int(self.now)
+        key = (second if show_seconds else second // 60, show_seconds, twelve_hour, show_ampm)
+        if key != self._time_key:
+            self._time_str = format_time(self.local(), show_seconds, twelve_hour, show_ampm)
+            self._time_key = key
+        return self._time_str
+
+    def date_str(self, date_format):
+        """The date formatted with a strftime format"""
+        day_start, day_end = self._day
+        if date_format != self._date_format or not day_start <= self.now < day_end:
+            local = self.local()
+            self._date_str = time.strftime(date_format, local)
+            self._date_format = date_format
+            midnight = (local.tm_year, local.tm_mon, local.tm_mday, 0, 0, 0, 0, 0, -1)
+            tomorrow = midnight[:2] + (local.tm_mday + 1,) + midnight[3:]
+            self._day = (time.mktime(midnight), time.mktime(tomorrow))
+        return self._date_str
+
+class FakeTimeSource(TimeSource):
+    """A TimeSource on simulated time that only moves when advanced"""
+
+    def __init__(self, start):
+        self.simulated = start
+        super().__init__(lambda: self.simulated)
+
+    def advance(self, seconds):
+        self.simulated += seconds
+
+class Timer:
+    """A stopwatch, or a countdown from duration seconds, with centisecond digits
+
+    Runs on time.monotonic so it isn't thrown off by changes to the wall
+    clock. read() samples the clock once per frame, like TimeSource.tick().
+    """
+
+    def __init__(self, duration=None, clock=time.monotonic):
+        self.duration = duration  # None for a stopwatch
+        self.clock = clock
+        self.started_at = None  # Clock reading when last started, None while paused
+        self.banked = 0.0  # Time counted before the last pause
+        self.elapsed = 0.0  # As of the last read()
+
+    @property
+    def running(self):
+        return self.started_at is not None
+
+    def read(self):
+        """Sample the clock; returns True the first time a countdown reaches zero"""
+        elapsed = self.banked
+        if self.started_at is not None:
+            elapsed += self.clock() - self.started_at
+        self.elapsed = elapsed
+        if self.duration is not None and self.running and elapsed >= self.duration:
+            self.banked = self.elapsed = self.duration
+            self.started_at = None
+            return True
+        return False
+
+    def toggle(self):
+        """Start or pause"""
+        if self.started_at is None:
+            if self.duration is not None and self.banked >= self.duration:
+                self.banked = 0.0  # Start a finished countdown over
+            self.started_at = self.clock()
+        else:
+            self.banked += self.clock() - self.started_at
+            self.started_at = None
+
+    def reset(self):
+        self.started_at = None
+        self.banked = self.elapsed = 0.0
+
+    def text(self):
+        """The time to show: [H:]MM:SS.cc, a countdown rounded up so it ends on 00:00.00"""
+        if self.duration is None:
+            centis = int(self.elapsed * 100)
+        else:
+            centis = int(-(-(self.duration - self.elapsed) * 100 // 1))
+        seconds, centis = divmod(centis, 100)
+        minutes, seconds = divmod(seconds, 60)
+        hours, minutes = divmod(minutes, 60)
+        if hours:
+            return f"{hours}:{minutes:02d}:{seconds:02d}.{centis:02d}"
+        return f"{minutes:02d}:{seconds:02d}.{centis:02d}"
+
+    def label(self):
+        """The line shown under the digits"""
+        if self.duration is None:
+            name = "Stopwatch"
+        else:
+            minutes, seconds = divmod(int(self.duration), 60)
+            name = f"Countdown from {minutes}:{seconds:02d}"
+        if self.running:
+            return name
+        if self.duration is not None and self.elapsed >= self.duration:
+            return f"{name} finished (space to restart)"
+        return f"{name} (space to {'start' if self.elapsed == 0 else 'resume'})"
+
+# Highest accepted timer_frame_rate; the display has no more than 100 states a second
+MAX_TIMER_FRAME_RATE = 120
+
+def next_timer_frame(now, frame_rate):
+    """Wall-clock time of the next frame of a running timer"""
+    return (int(now * frame_rate) + 1) / frame_rate
+
+# Row fragment used for characters a font doesn't define
+BLANK_GLYPH = ('     ' + '  ',) * 5
+
+# Where the clock and date go for the current screen size; degraded means
+# the glyphs don't fit and the time is shown as plain text
+ClockLayout = namedtuple('ClockLayout', ['degraded', 'x', 'y', 'date_x', 'date_y'])
+
+# A fully rendered time string: the joined rows, the (x offset, fragment)
+# cells of every row and the clock width
+GlyphStrip = namedtuple('GlyphStrip', ['rows', 'cells', 'width'])
+
+def compile_font(font):
+    """Turn a FONTS entry into per-character row fragments with the glyph spacing applied"""
+    return {char: tuple(row + '  ' for row in seg) for char, seg in font.items()}
+
+def scale_glyphs(glyphs, scale):
+    """Upsample compiled glyphs by an integer factor in both directions
+
+    Widening is a single str.translate per row (each cell character maps to
+    itself repeated), so the work happens in C rather than per cell.
+    """
+    if scale == 1:
+        return glyphs
+    chars = {c for seg in glyphs.values() for row in seg for c in row}
+    table = str.maketrans({c: c * scale for c in chars})
+    return {char: tuple(wide for row in seg for wide in (row.translate(table),) * scale)
+            for char, seg in glyphs.items()}
+
+class GlyphCache:
+    """Compiled fonts (per scale) plus a bounded LRU of rendered time strings"""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.fonts = {}  # (font index, scale) -> compiled font
+        self.strips = OrderedDict()
+
+    def glyphs(self, font_index, scale=1):
+        """Return the compiled glyphs of a font at a scale, compiling them on first use"""
+        key = (font_index, scale)
+        glyphs = self.fonts.get(key)
+        if glyphs is None:
+            if scale == 1:
+                glyphs = compile_font(FONT_REGISTRY.get(font_index))
+            else:
+                glyphs = scale_glyphs(self.glyphs(font_index), scale)
+            self.fonts[key] = glyphs
+        return glyphs
+
+    def max_width(self, font_index, scale=1):
+        """Width of the widest glyph of a font, spacing included"""
+        return max(len(seg[0]) for seg in self.glyphs(font_index).values()) * scale
+
+    def render(self, font_index, time_str, twelve_hour=False, ampm=False, scale=1):
+        """Return the GlyphStrip for a time string, rendering it if it isn't cached"""
+        key = (font_index, time_str, twelve_hour, ampm, scale)
+        strip = self.strips.get(key)
+        if strip is not None:
+            self.strips.move_to_end(key)
+            return strip
+
+        glyphs = self.glyphs(font_index, scale)
+        blank = BLANK_GLYPH if scale == 1 else scale_glyphs({None: BLANK_GLYPH}, scale)[None]
+        segs = [glyphs.get(char, blank) for char in time_str]
+        rows = []
+        cells = []
+        for i in range(len(blank)):
+            row_cells = []
+            x = 0
+            for seg in segs:
+                row_cells.append((x, seg[i]))
+                x += len(seg[i])
+            cells.append(tuple(row_cells))
+            rows.append(''.join(seg[i] for seg in segs))
+        strip = GlyphStrip(tuple(rows), tuple(cells), len(rows[0]))
+
+        self.strips[key] = strip
+        if len(self.strips) > self.maxsize:
+            self.strips.popitem(last=False)
+        return strip
+
+# Shared by the curses interface and simple_clock
+GLYPH_CACHE = GlyphCache()
+
+# Saved FrameTables, memory-mapped back by FrameTable.cached()
+FRAME_TABLE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+                               'that-clock-sucks', 'frames')
+
+class FrameTable:
+    """Every frame of a day for one font and time format, in one flat array
+
+    Frame n is the clock at n seconds (n minutes without seconds) past
+    midnight, stored as its rows back to back at a fixed stride. Glyphs only
+    use a handful of characters, so each one is stored as a single byte: its
+    index in `alphabet`. A table for the Original font with seconds is about
+    24 MB, so it's written to disk and memory-mapped back instead of being
+    held in memory.
+    """
+
+    MAGIC = b'TCS-FRAMES 1\n'
+
+    def __init__(self, data, alphabet, height, stride, show_seconds, offset=0):
+        self.data = data  # An mmap of a saved table
+        self.offset = offset  # Where the frames start in data
+        self.alphabet = alphabet
+        self.height = height
+        self.stride = stride
+        self.show_seconds = show_seconds
+        self.frame_size = height * stride
+        # Charmap for codecs.charmap_decode, which decodes a whole frame in C
+        self.charmap = alphabet + '\ufffe' * (256 - len(alphabet))
+
+    def __len__(self):
+        return 86400 if self.show_seconds else 1440
+
+    @classmethod
+    def frames(cls, font_index, show_seconds=True, twelve_hour=False, ampm=False):
+        """The header of a day's table and a generator of its data, an hour at a time
+
+        A clock string is the hour and minute, the seconds and the AM/PM
+        suffix, so the glyph rows of those parts are rendered once each (1440
+        minutes, 60 seconds, 24 suffixes) and every frame is just the three
+        pre-encoded byte strings joined and padded.
+        """
+        glyphs = GLYPH_CACHE.glyphs(font_index)
+        height = len(BLANK_GLYPH)
+
+        def rows(text):
+            return [''.join(glyphs.get(char, BLANK_GLYPH)[i] for char in text) for i in range(height)]
+
+        minutes, suffixes = [], []
+        for hour in range(24):
+            local = time.struct_time((2000, 1, 1, hour, 0, 0, 5, 1, -1))
+            prefix = format_time(local, False, twelve_hour, False)
+            suffixes.append(rows(format_time(local, False, twelve_hour, ampm)[len(prefix):]))
+            for minute in range(60):
+                local = time.struct_time((2000, 1, 1, hour, minute, 0, 5, 1, -1))
+                minutes.append(rows(format_time(local, False, twelve_hour, False)))
+        seconds = [rows(f":{second:02d}") for second in range(60)] if show_seconds else [[''] * height]
+
+        alphabet = ''.join(sorted({char for part in (minutes, seconds, suffixes)
+                                   for frame in part for row in frame for char in row} | {' '}))
+        encode = str.maketrans({char: chr(code) for code, char in enumerate(alphabet)})
+
+        def encoded(parts):
+            return [[row.translate(encode).encode('latin-1') for row in frame] for frame in parts]
+
+        minutes, seconds, suffixes = encoded(minutes), encoded(seconds), encoded(suffixes)
+
+        def width(part, i):
+            return max(len(frame[i]) for frame in part)
+
+        stride = max(width(minutes, i) + width(seconds, i) + width(suffixes, i) for i in range(height))
+        space = bytes([alphabet.index(' ')])
+        pads = [space * n for n in range(stride + 1)]
+
+        def hours():
+            for hour, suffix in enumerate(suffixes):
+                yield b''.join(
+                    row + pads[stride - len(row)]
+                    for minute in minutes[hour * 60:hour * 60 + 60]
+                    for second in seconds
+                    for i in range(height)
+                    for row in (minute[i] + second[i] + suffix[i],))
+
+        header = {"alphabet": alphabet, "height": height, "stride": stride, "show_seconds": show_seconds}
+        return header, hours()
+
+    def index(self, local):
+        """Frame number of a struct_time"""
+        if self.show_seconds:
+            return local.tm_hour * 3600 + local.tm_min * 60 + min(local.tm_sec, 59)
+        return local.tm_hour * 60 + local.tm_min
+
+    def rows(self, index):
+        """The rows of a frame, padded with spaces to the table's stride"""
+        start = self.offset + index * self.frame_size
+        text = codecs.charmap_decode(self.data[start:start + self.frame_size], 'strict', self.charmap)[0]
+        stride = self.stride
+        return tuple(text[i:i + stride] for i in range(0, self.frame_size, stride))
+
+    @classmethod
+    def write(cls, path, font_index, show_seconds=True, twelve_hour=False, ampm=False):
+        """Render all frames of a day straight to a saved table, an hour at a time"""
+        header, hours = cls.frames(font_index, show_seconds, twelve_hour, ampm)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(cls.MAGIC + json.dumps(header).encode() + b'\n')
+            f.writelines(hours)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a saved table; raises ValueError if the file isn't a complete one"""
+        import mmap
+
+        with open(path, 'rb') as f:
+            if f.readline() != cls.MAGIC:
+                raise ValueError(f"{path} is not a frame table")
+            header = json.loads(f.readline())
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        table = cls(data, header["alphabet"], header["height"], header["stride"],
+                    header["show_seconds"], offset=len(cls.MAGIC) + len(json.dumps(header)) + 1)
+        if len(data) != table.offset + len(table) * table.frame_size:
+            raise ValueError(f"{path} is truncated")
+        return table
+
+    @classmethod
+    def cached(cls, font_index, show_seconds=True, twelve_hour=False, ampm=False):
+        """Map the table from FRAME_TABLE_DIR, writing it there the first time
+
+        Tables are keyed by a hash of the compiled glyphs, so an edited .font
+        file gets a new table. The table is never held in memory: it's
+        written an hour at a time and then mapped, and None is returned if
+        it can't be saved, so callers render frames themselves instead.
+        """
+        import hashlib
+
+        glyphs = GLYPH_CACHE.glyphs(font_index)
+        key = repr((sorted(glyphs.items()), show_seconds, twelve_hour, ampm)).encode()
+        path = os.path.join(FRAME_TABLE_DIR, hashlib.sha1(key).hexdigest()[:16] + '.frames')
+        try:
+            return cls.load(path)
+        except (OSError, ValueError, KeyError):
+            pass
+        try:
+            os.makedirs(FRAME_TABLE_DIR, exist_ok=True)
+            cls.write(path, font_index, show_seconds, twelve_hour, ampm)
+            return cls.load(path)
+        except (OSError, ValueError):
+            return None  # The table is only an optimization
+
+class ZoneOffsetCache:
+    """UTC offsets of IANA timezones, each cached until the zone's next transition"""
+
+    # Transitions are searched for a week at a time, up to a year ahead
+    SCAN_STEP = 7 * 86400
+    SCAN_LIMIT = 366 * 86400
+
+    def __init__(self):
+        self.zones = {}  # name -> ZoneInfo, or None if it can't be loaded
+        self.entries = {}  # name -> (offset, valid_from, valid_until)
+
+    def zone(self, name):
+        """Load a timezone once; None if the name or tzdata is unavailable"""
+        if name not in self.zones:
+            try:
+                from zoneinfo import ZoneInfo
+                self.zones[name] = ZoneInfo(name)
+            except Exception:
+                self.zones[name] = None
+        return self.zones[name]
+
+    def offset(self, name, now):
+        """UTC offset of the zone in seconds at time now, or None for an unknown zone"""
+        entry = self.entries.get(name)
+        if entry is not None and entry[1] <= now < entry[2]:
+            return entry[0]
+        zone = self.zone(name)
+        if zone is None:
+            return None
+        start = int(now)
+        offset = self.offset_at(zone, start)
+        self.entries[name] = (offset, start, self.next_transition(zone, start, offset))
+        return offset
+
+    @staticmethod
+    def offset_at(zone, t):
+        from datetime import datetime
+
+        return int(datetime.fromtimestamp(t, zone).utcoffset().total_seconds())
+
+    def next_transition(self, zone, start, offset):
+        """First second after start where the offset differs (or the end of the scan)"""
+        lo = start
+        while lo - start < self.SCAN_LIMIT:
+            hi = lo + self.SCAN_STEP
+            if self.offset_at(zone, hi) != offset:
+                # Narrow it down to the exact second
+                while hi - lo > 1:
+                    mid = (lo + hi) // 2
+                    if self.offset_at(zone, mid) == offset:
+                        lo = mid
+                    else:
+                        hi = mid
+                return hi
+            lo = hi
+        return lo
+
+ZONE_OFFSETS = ZoneOffsetCache()
+
+# Menu hint text and menu width
+MENU_HINT = "Press F1 for menu"
+MENU_WIDTH = 40
+
+# Width of the F3 stats overlay
+STATS_WIDTH = 64
+
+# Width of the box a fired alarm is shown in
+ALARM_WIDTH = 50
+
+# Columns between dashboard panels
+DASHBOARD_GAP = 2
+
+# Color setting names: 0 = white, 1-6 = basic colors, 7 = rainbow rows,
+# 8 = hue gradient across the clock, 9 = the gradient slowly cycling
+COLOR_NAMES = ["White", "Red", "Green", "Yellow", "Blue", "Magenta", "Cyan", "Rainbow",
+               "Gradient", "Animated gradient"]
+RAINBOW, GRADIENT, ANIMATED_GRADIENT = 7, 8, 9
+
+# The gradient is split into bands of one color each, and hues are quantized
+# so the number of color pairs in use stays small
+GRADIENT_BANDS = 16
+GRADIENT_STEPS = 48
+GRADIENT_SPEED = 0.1  # Animated gradient cycles per second
+
+# Basic color pairs in hue order (red, yellow, green, cyan, blue, magenta)
+BASIC_HUE_PAIRS = [1, 3, 2, 6, 4, 5]
+
+# ANSI foreground codes for the color settings 0-6 (0 = terminal default)
+ANSI_COLORS = ['39', '31', '32', '33', '34', '35', '36']
+
+# Clear the screen and hide the cursor before the first frame; reset colors,
+# show the cursor and move below the clock when done
+ANSI_CLEAR = '\033[2J\033[?25l'
+ANSI_RESTORE = '\033[0m\033[?25h\033[7;1H\n'
+
+def gradient_phase(now, color):
+    """Hue offset of the gradient at a given time (only the animated mode moves)"""
+    return (now * GRADIENT_SPEED) % 1.0 if color == ANIMATED_GRADIENT else 0.0
+
+def next_gradient_step(now):
+    """Wall-clock time at which the animated gradient's quantized hues next change"""
+    rate = GRADIENT_SPEED * GRADIENT_STEPS
+    return (int(now * rate) + 1) / rate
+
+def gradient_hues(bands, phase):
+    """Quantized hue (0..GRADIENT_STEPS-1) of each band of a gradient"""
+    return [int((band / bands + phase) * GRADIENT_STEPS) % GRADIENT_STEPS for band in range(bands)]
+
+class ColorAllocator:
+    """Curses color pairs for gradient hues, defined on first use and reused LRU
+
+    Direct-color terminals (COLORS of 2**24, e.g. TERM=xterm-direct) get the
+    exact RGB hue, 256-color terminals the nearest color of the xterm cube and
+    anything else the six basic colors of pairs 1-6. Pairs from FIRST_PAIR up
+    are handed out until curses runs out; after that the least recently used
+    pair is redefined and on_evict(attr) tells the caller that anything drawn
+    with it has to be repainted.
+    """
+
+    FIRST_PAIR = 8  # Pairs 1-7 are the fixed basic colors
+
+    def __init__(self, colors, pairs, extended=True, on_evict=None):
+        if colors >= 1 << 24 and extended:
+            self.mode = 'direct'
+        elif 256 <= colors < 1 << 24:
+            self.mode = '256'
+        else:
+            self.mode = 'basic'
+        # Pair numbers above 32767 need extended color support as well
+        limit = pairs if extended else min(pairs, 32768)
+        self.capacity = max(0, limit - self.FIRST_PAIR)
+        if not self.capacity:
+            self.mode = 'basic'
+        self.on_evict = on_evict
+        self.pairs = OrderedDict()  # hue -> pair number, least recently used first
+
+    def attr(self, hue):
+        """Return the curses attribute for a quantized hue"""
+        if self.mode == 'basic':
+            return curses.color_pair(BASIC_HUE_PAIRS[hue * 6 // GRADIENT_STEPS])
+        pair = self.pairs.get(hue)
+        if pair is not None:
+            self.pairs.move_to_end(hue)
+            return curses.color_pair(pair)
+
+        if len(self.pairs) < self.capacity:
+            pair = self.FIRST_PAIR + len(self.pairs)
+        else:
+            _, pair = self.pairs.popitem(last=False)
+            if self.on_evict:
+                self.on_evict(curses.color_pair(pair))
+        import colorsys
+
+        r, g, b = colorsys.hsv_to_rgb(hue / GRADIENT_STEPS, 1.0, 1.0)
+        if self.mode == 'direct':
+            color = (round(r * 255) << 16) | (round(g * 255) << 8) | round(b * 255)
+        else:
+            color = 16 + 36 * round(r * 5) + 6 * round(g * 5) + round(b * 5)
+        curses.init_pair(pair, color, curses.COLOR_BLACK)
+        self.pairs[hue] = pair
+        return curses.color_pair(pair)
+
+class AnsiFrameEncoder:
+    """Encode clock frames as cursor-addressed ANSI escapes for changed characters only
+
+    The encoder remembers the rows it has sent, so encode() returns just the
+    escapes for the part of each row that differs from the previous frame.
+    """
+
+    def __init__(self, color=0, top=1, left=1):
+        self.color = color
+        self.top = top  # 1-based terminal row of the first clock row
+        self.left = left  # 1-based terminal column of the clock
+        self.rows = ()  # Rows as last sent
+
+    def reset(self):
+        """Forget what was sent so the next frame is complete"""
+        self.rows = ()
+
+    def row_color(self, row):
+        """ANSI color code for a clock row (Rainbow cycles through colors 1-6)
+
+        The gradient modes need a color per column and are shown as Rainbow.
+        """
+        if self.color >= RAINBOW:
+            return ANSI_COLORS[(row % 6) + 1]
+        return ANSI_COLORS[self.color] if 0 <= self.color < len(ANSI_COLORS) else ANSI_COLORS[0]
+
+    def diff(self, strip):
+        """Return the (row, x, text) writes that turn the previous frame into this one"""
+        return self.diff_rows(strip.rows)
+
+    def diff_rows(self, rows):
+        """Like diff(), for rows of text such as the ones a FrameTable stores
+
+        Each changed row is rewritten from its first to its last changed
+        character, so a tick that only changes the seconds sends only those.
+        """
+        changes = []
+        old_rows = self.rows
+        for i in range(max(len(rows), len(old_rows))):
+            new = rows[i] if i < len(rows) else ''
+            old = old_rows[i] if i < len(old_rows) else ''
+            if new == old:
+                continue
+            new = new.ljust(len(old))  # Blank what a wider row left behind
+            # Bisect on slice comparisons for the unchanged prefix and suffix,
+            # which is far quicker than stepping through characters in Python
+            lo, hi = 0, min(len(old), len(new))
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if old[:mid] == new[:mid]:
+                    lo = mid
+                else:
+                    hi = mid - 1
+            start, end = lo, len(new)
+            if len(old) == end:
+                lo, hi = 0, end - start
+                while lo < hi:
+                    mid = (lo + hi + 1) // 2
+                    if old[end - mid:] == new[end - mid:]:
+                        lo = mid
+                    else:
+                        hi = mid - 1
+                end -= lo
+            changes.append((i, start, new[start:end]))
+        self.rows = tuple(rows)
+        return changes
+
+    def escapes(self, changes):
+        """ANSI escapes for a list of writes from diff()"""
+        out = []
+        current_color = None
+        for i, x, text in changes:
+            color = self.row_color(i)
+            if color != current_color:
+                out.append(f'\033[{color}m')
+                current_color = color
+            out.append(f'\033[{self.top + i};{self.left + x}H{text}')
+        if current_color is not None:
+            out.append('\033[0m')
+        return ''.join(out)
+
+    def encode(self, strip):
+        """Return the escapes that turn the previous frame into this one ('' if unchanged)"""
+        return self.escapes(self.diff(strip))
+
+class FrameRenderer:
+    """Damage-tracking renderer that only rewrites cells changed since the last frame
+
+    Every frame the caller registers cells (a keyed piece of text at a
+    position) in drawing order between begin() and flush(). flush() compares
+    them with the previous frame and only touches the screen where something
+    changed, so an unchanged frame writes nothing at all.
+    """
+
+    def __init__(self, screen, full_screen=True):
+        self.screen = screen
+        self.full_screen = full_screen  # Whether the window covers the whole terminal
+        self.height, self.width = screen.getmaxyx()
+        self.cells = {}  # key -> (y, x, text, attr) as drawn last frame
+        self.pending = {}
+        self.needs_clear = True  # First frame starts from a blank screen
+        # Output of the last flush: writes and an estimate of the bytes they
+        # send (the text plus a cursor move each), and whether it refreshed
+        self.writes = 0
+        self.bytes = 0
+        self.refreshed = False
+
+    def begin(self):
+        """Start collecting the cells of a new frame"""
+        self.pending = {}
+        self.writes = 0
+        self.bytes = 0
+
+    def put(self, key, y, x, text, attr=0):
+        """Register a cell for the current frame (later cells draw on top)
+
+        Cells are clipped to the screen; curses would otherwise wrap long
+        text onto the next line.
+        """
+        if y >= self.height or x >= self.width:
+            return
+        if x + len(text) > self.width:
+            text = text[:self.width - x]
+        self.pending[key] = (y, x, text, attr)
+
+    def forget_attr(self, attr):
+        """Make the next flush repaint every cell drawn with this attribute"""
+        for key, (y, x, text, old_attr) in self.cells.items():
+            if old_attr == attr:
+                self.cells[key] = (y, x, text, None)
+
+    def invalidate(self):
+        """Forget the previous frame so the next flush repaints everything"""
+        self.cells = {}
+        self.needs_clear = True
+
+    def resize(self, height, width):
+        """Adopt a new screen size; the next flush repaints everything"""
+        self.height, self.width = height, width
+        self.invalidate()
+
+    def flush(self):
+        """Write the changed cells; returns True if anything was drawn
+
+        Nothing is sent to the terminal here. Every window is in a curses
+        panel, so the caller stages them all with update_panels() and sends
+        them at once with doupdate(). Calling noutrefresh() on the window
+        would clear its touched lines before update_panels() can see them,
+        and the panels above it would not be redrawn over the change.
+        """
+        if self.needs_clear:
+            # clear() makes curses repaint the whole terminal, which a window
+            # that only covers part of it must not do
+            if self.full_screen:
+                self.screen.clear()
+            else:
+                self.screen.erase()
+            self.needs_clear = False
+            self.bytes += self.height * self.width  # Curses repaints every cell
+            dirty = True
+        else:
+            dirty = False
+
+        # Columns per row whose content is no longer valid. Any cell drawn
+        # over one of them must be rewritten even if it didn't change itself.
+        damaged = {}
+        for key, old in self.cells.items():
+            new = self.pending.get(key)
+            if new == old:
+                continue
+            y, x, text, _ = old
+            if new is None or new[0] != y or new[1] != x or len(new[2]) < len(text):
+                self._write(y, x, ' ' * len(text), 0)
+                self._damage(damaged, y, x, x + len(text))
+
+        for key, new in self.pending.items():
+            y, x, text, attr = new
+            end = x + len(text)
+            columns = damaged.get(y)
+            if self.cells.get(key) != new or (columns is not None and columns.find(1, x, end) != -1):
+                self._write(y, x, text, attr)
+                self._damage(damaged, y, x, end)
+
+        self.cells = self.pending
+        self.pending = {}
+        self.refreshed = bool(damaged or dirty)
+        return self.refreshed
+
+    @staticmethod
+    def _damage(damaged, y, x, end):
+        """Mark columns x..end of row y as rewritten this frame"""
+        columns = damaged.get(y)
+        if columns is None:
+            columns = damaged[y] = bytearray(end)
+        elif len(columns) < end:
+            columns.extend(bytes(end - len(columns)))
+        columns[x:end] = b'\x01' * (end - x)
+
+    def _write(self, y, x, text, attr):
+        self.writes += 1
+        self.bytes += len(text.encode()) + 8  # 8: cursor move and attributes, roughly
+        try:
+            self.screen.addstr(y, x, text, attr)
+        except curses.error:
+            pass  # Writing the bottom-right cell or off-screen raises
+
+class Overlay:
+    """A window in a curses panel above the clock, with its own FrameRenderer
+
+    The panel library keeps overlays on top of the clock window, so clock
+    ticks never repaint them and redrawing an overlay only rewrites its own
+    changed cells.
+    """
+
+    def __init__(self, height, width, y, x):
+        self.window = curses.newwin(height, width, y, x)
+        self.panel = curses.panel.new_panel(self.window)
+        self.panel.hide()
+        self.visible = False
+        self.renderer = FrameRenderer(self.window, full_screen=False)
+
+    @classmethod
+    def create(cls, height, width, y, x, screen_height, screen_width):
+        """An overlay clipped to the screen, or None if none of it would be on screen"""
+        height = min(height, screen_height - y)
+        width = min(width, screen_width - x)
+        if height <= 0 or width <= 0:
+            return None
+        try:
+            return cls(height, width, y, x)
+        except curses.error:
+            return None
+
+    def update(self, visible, draw):
+        """Show or hide the overlay and, if shown, draw it with draw(put)
+
+        Returns True if anything on screen changed.
+        """
+        changed = visible != self.visible
+        if changed:
+            if visible:
+                self.panel.show()
+            else:
+                self.panel.hide()
+            self.visible = visible
+        if visible:
+            self.renderer.begin()
+            draw(self.renderer.put)
+            changed |= self.renderer.flush()
+        return changed
+
+class TickScheduler:
+    """Sleep until input arrives, the displayed time has to change or a worker wakes us"""
+
+    def __init__(self, input_fd):
+        self.input_fd = input_fd
+        # Self-pipe so background threads can interrupt the wait
+        self.wake_r, self.wake_w = os.pipe()
+        os.set_blocking(self.wake_r, False)
+        os.set_blocking(self.wake_w, False)
+
+    @staticmethod
+    def next_tick(now, show_seconds=True):
+        """Return the wall-clock time of the next second (or minute) boundary"""
+        period = 1 if show_seconds else 60
+        return (int(now) // period + 1) * period
+
+    def wait(self, deadline):
+        """Block until input is readable, a wake() or the deadline; returns True on input"""
+        timeout = max(0.0, deadline - time.time())
+        try:
+            readable, _, _ = select.select([self.input_fd, self.wake_r], [], [], timeout)
+        except InterruptedError:
+            return False
+        if self.wake_r in readable:
+            try:
+                while os.read(self.wake_r, 512):
+                    pass
+            except BlockingIOError:
+                pass
+        return self.input_fd in readable
+
+    def wake(self):
+        """Interrupt wait() from any thread"""
+        try:
+            os.write(self.wake_w, b'!')
+        except BlockingIOError:
+            pass  # Pipe full, a wakeup is already pending
+
+INPUT_BATCH = 512  # Keys handled per pass before the frame is drawn
+
+class Notifications:
+    """Status messages shown in place of menu items, each until its deadline
+
+    Owned by the UI loop: the earliest deadline is part of what the loop sleeps
+    until, so messages go away on time without blocking the clock.
+    """
+
+    def __init__(self):
+        self.messages = {}  # key -> (text, expires_at or None, on_expire)
+
+    def show(self, key, text, duration=None, on_expire=None):
+        """Show text for key, for duration seconds or until replaced; on_expire() runs afterwards"""
+        expires_at = time.time() + duration if duration is not None else None
+        self.messages[key] = (text, expires_at, on_expire)
+
+    def clear(self, key):
+        self.messages.pop(key, None)
+
+    def get(self, key, default=None):
+        message = self.messages.get(key)
+        return message[0] if message else default
+
+    def next_deadline(self):
+        """Return when the next message expires, or None"""
+        deadlines = [expires_at for _, expires_at, _ in self.messages.values() if expires_at is not None]
+        return min(deadlines) if deadlines else None
+
+    def expire(self, now):
+        """Drop the messages that are due and run their on_expire callbacks"""
+        due = [key for key, (_, expires_at, _) in self.messages.items()
+               if expires_at is not None and expires_at <= now]
+        for key in due:
+            _, _, on_expire = self.messages.pop(key)
+            if on_expire:
+                on_expire()
+
+# One entry of alarms.json. It fires daily at `daily` seconds past local
+# midnight, once at the `once` timestamp, or every `period` seconds from
+# `anchor` seconds past midnight until the end of each day
+Alarm = namedtuple('Alarm', ['label', 'daily', 'once', 'period', 'anchor'])
+
+# Seconds a fired alarm's message stays up (Esc dismisses it sooner)
+ALARM_SHOW_SECONDS = 10
+
+def parse_time_of_day(text):
+    """Seconds past midnight of 'HH:MM' or 'HH:MM:SS'"""
+    parts = [int(part) for part in str(text).split(':')]
+    if len(parts) not in (2, 3):
+        raise ValueError(f"expected HH:MM[:SS], got {text!r}")
+    hours, minutes, seconds = parts + [0] * (3 - len(parts))
+    if not (0 <= hours < 24 and 0 <= minutes < 60 and 0 <= seconds < 60):
+        raise ValueError(f"expected HH:MM[:SS], got {text!r}")
+    return hours * 3600 + minutes * 60 + seconds
+
+def parse_alarm(entry):
+    """Turn an alarms.json entry into an Alarm; raises ValueError (or KeyError) if it's malformed
+
+    {"at": "07:30"} fires every day, {"at": "07:30", "date": "2026-03-01"}
+    once, and {"every": "45m", "from": "09:00"} every 45 minutes from 09:00
+    until midnight, starting over at 09:00 the next day ("from" defaults to
+    midnight, so {"every": "1h"} is an hourly chime). "label" is the text shown.
+    """
+    if not isinstance(entry, dict):
+        raise ValueError("an alarm must be an object")
+    label = str(entry.get('label', 'Alarm'))
+    if 'every' in entry:
+        period = parse_duration(str(entry['every']))
+        if period < 1:
+            raise ValueError("an alarm can't repeat more than once a second")
+        return Alarm(label, None, None, period, parse_time_of_day(entry.get('from', '00:00')))
+    daily = parse_time_of_day(entry['at'])
+    if 'date' in entry:
+        return Alarm(label, None, parse_start(f"{entry['date']} {entry['at']}"), None, None)
+    return Alarm(label, daily, None, None, None)
+
+def next_alarm_time(alarm, after):
+    """First time the alarm fires strictly after `after`, or None if it never will again"""
+    if alarm.once is not None:
+        return alarm.once if alarm.once > after else None
+    local = time.localtime(after)
+    minutes, seconds = divmod(alarm.daily if alarm.period is None else alarm.anchor, 60)
+    hours, minutes = divmod(minutes, 60)
+    # mktime normalizes the day overflow and picks the right DST offset
+    for day in (0, 1, 2):
+        candidate = time.mktime((local.tm_year, local.tm_mon, local.tm_mday + day,
+                                 hours, minutes, seconds, 0, 0, -1))
+        if alarm.period is not None and candidate <= after:
+            # A reminder repeats from its start until midnight
+            candidate += ((after - candidate) // alarm.period + 1) * alarm.period
+            midnight = time.mktime((local.tm_year, local.tm_mon, local.tm_mday + day + 1,
+                                    0, 0, 0, 0, 0, -1))
+            if candidate >= midnight:
+                continue
+        if candidate > after:
+            return candidate
+    return None
+
+class AlarmSchedule:
+    """Alarms from alarms.json in a heap ordered by when they next fire
+
+    The earliest one is part of what the UI loop sleeps until, so a tick only
+    looks at the top of the heap and an alarm wakes the loop at its second.
+    Firing an alarm reschedules it in O(log n), however many there are.
+    """
+
+    def __init__(self, alarms, now, path=None):
+        self.path = path
+        self.file_state = stat_file(path) if path else None
+        self.heap = []
+        for seq, alarm in enumerate(alarms):
+            due = next_alarm_time(alarm, now)
+            if due is not None:
+                self.heap.append((due, seq, alarm))
+        heapq.heapify(self.heap)
+
+    @classmethod
+    def load(cls, now, path=None):
+        """Read alarms.json, skipping entries that don't parse; a missing file means no alarms"""
+        path = path or ALARMS_FILE
+        alarms = []
+        try:
+            with open(path, 'r') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = []
+        if isinstance(entries, list):
+            for entry in entries:
+                try:
+                    alarms.append(parse_alarm(entry))
+                except (ValueError, KeyError, TypeError):
+                    pass
+        return cls(alarms, now, path)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def next_due(self):
+        """When the next alarm fires, or None"""
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, now):
+        """Return the (due, Alarm) pairs due by now and schedule their next firing
+
+        An alarm that was missed several times (the machine was asleep) fires
+        once and continues after now.
+        """
+        fired = []
+        heap = self.heap
+        while heap and heap[0][0] <= now:
+            due, seq, alarm = heap[0]
+            fired.append((due, alarm))
+            following = next_alarm_time(alarm, max(due, now))
+            if following is None:
+                heapq.heappop(heap)
+            else:
+                heapq.heapreplace(heap, (following, seq, alarm))
+        return fired
+
+class FrameStats:
+    """Per-frame render time, output and tick lateness for the F3 overlay and --profile
+
+    With a profile file, every frame is written to it as a JSON line and the
+    p50/p99 of each metric are appended when the app exits. The percentiles
+    come from histograms of the values rounded to PROFILE_DIGITS significant
+    digits, so memory stays the same however long the clock runs.
+    """
+
+    FIELDS = ('render_ms', 'bytes', 'writes', 'late_ms')
+    PROFILE_DIGITS = 3
+
+    def __init__(self, profile_path=None):
+        self.profile = open(profile_path, 'w', buffering=1) if profile_path else None
+        self.histograms = {field: Counter() for field in self.FIELDS}
+        self.maxima = {}  # Exact largest value of each field
+        self.recent = deque()  # Times of the frames drawn in the last second
+        self.frames = 0
+        self.redraws = 0  # Frames that reached the terminal
+        self.due = None  # Tick boundary the next frame was scheduled for
+        self.last = None
+
+    def record(self, now, render_time, writes, output_bytes, refreshed):
+        """Record one frame; now is the wall-clock time it was drawn for"""
+        self.frames += 1
+        self.redraws += refreshed
+        late = None if self.due is None else max(0.0, now - self.due)
+        self.due = None
+        recent = self.recent
+        recent.append(now)
+        while recent and recent[0] <= now - 1.0:
+            recent.popleft()
+        self.last = {
+            't': round(now, 3),
+            'render_ms': round(render_time * 1e3, 3),
+            'bytes': output_bytes,
+            'writes': writes,
+            'late_ms': None if late is None else round(late * 1e3, 3),
+            'refreshed': refreshed,
+        }
+        if self.profile:
+            self.profile.write(json.dumps(self.last) + '\n')
+            for field in self.FIELDS:
+                value = self.last[field]
+                if value is not None:
+                    self.histograms[field][self.bucket(value)] += 1
+                    self.maxima[field] = max(value, self.maxima.get(field, value))
+
+    @classmethod
+    def bucket(cls, value):
+        """value rounded to PROFILE_DIGITS significant digits"""
+        rounded = float(f"{value:.{cls.PROFILE_DIGITS}g}")
+        return int(rounded) if isinstance(value, int) else rounded
+
+    def fps(self):
+        return len(self.recent)
+
+    def overlay(self):
+        """One line summing up the last frame"""
+        last = self.last
+        if last is None:
+            return "collecting stats..."
+        late = '-' if last['late_ms'] is None else f"{last['late_ms']:.1f}ms"
+        return (f"{last['render_ms']:.2f}ms {self.fps()}fps {last['bytes']}B "
+                f"{last['writes']}w {self.redraws}/{self.frames} redrawn late {late}")
+
+    def summary(self):
+        """p50/p99 of every metric over the whole run"""
+        summary = {'frames': self.frames, 'redraws': self.redraws}
+        for field, histogram in self.histograms.items():
+            count = sum(histogram.values())
+            if count:
+                summary[field] = {'p50': self.percentile(histogram, int(0.50 * (count - 1))),
+                                  'p99': self.percentile(histogram, int(0.99 * (count - 1))),
+                                  'max': self.maxima[field]}
+        return summary
+
+    @staticmethod
+    def percentile(histogram, rank):
+        """The value at rank (from 0) in sorted order"""
+        for value in sorted(histogram):
+            rank -= histogram[value]
+            if rank < 0:
+                return value
+
+    def close(self):
+        if self.profile:
+            self.profile.write(json.dumps({'summary': self.summary()}) + '\n')
+            self.profile.close()
+            self.profile = None
+
+def systemctl(*args):
+    """Run a systemctl --user command quietly; returns its exit status"""
+    import subprocess
+    try:
+        return subprocess.run(['systemctl', '--user', *args], stdin=subprocess.DEVNULL,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode
+    except OSError:
+        return 127  # systemctl isn't installed
+
+def set_startup_service(enable):
+    """Install and enable, or disable and remove, the systemd user service
+
+    Blocks on systemctl, so ClockApp runs it on a worker thread. Returns the
+    status text for the menu.
+    """
+    # Create the systemd user directory if it doesn't exist
+    systemd_dir = os.path.expanduser('~/.config/systemd/user')
+    os.makedirs(systemd_dir, exist_ok=True)
+
+    service_file = os.path.join(systemd_dir, 'that-clock-sucks.service')
+
+    if not enable:
+        # Disable the service
+        systemctl('disable', 'that-clock-sucks.service')
+        # Remove the service file
+        if os.path.exists(service_file):
+            os.remove(service_file)
+        return "Startup disabled"
+
+    # Create the service file. Prefer the installed launcher, which
+    # imports main.py so its bytecode is cached between boots
+    script_path = os.path.abspath(__file__)
+    launcher = os.path.join(os.path.dirname(script_path), 'clock-sucks')
+    command = launcher if os.access(launcher, os.X_OK) else f"/usr/bin/python3 {script_path}"
+    service_content = f"""[Unit]
+Description=That Clock Sucks
+After=graphical-session.target
+
+[Service]
+Type=simple
+ExecStart={command}
+Restart=always
+RestartSec=5
+
+[Install]
+WantedBy=default.target
+"""
+    with open(service_file, 'w') as f:
+        f.write(service_content)
+
+    # Reload systemd user daemon
+    systemctl('daemon-reload')
+    # Enable the service
+    systemctl('enable', 'that-clock-sucks.service')
+    return "Startup enabled"
+
 class ClockApp:
-    def __init__(self, stdscr):
+    # User configuration, saved to config.json when changed
+    show_seconds = SettingAttribute("show_seconds")
+    show_date = SettingAttribute("show_date")
+    date_format = SettingAttribute("date_format")
+    show_menu_hint = SettingAttribute("show_menu_hint")
+    current_font = SettingAttribute("current_font")
+    current_color = SettingAttribute("current_color")  # Index into COLOR_NAMES
+    time_format_12hour = SettingAttribute("time_format_12hour")  # False = 24-hour, True = 12-hour
+    show_ampm = SettingAttribute("show_ampm")  # Whether to show AM/PM in 12-hour mode
+    dashboard = SettingAttribute("dashboard")  # Grid of timezone clocks instead of one clock
+    auto_scale = SettingAttribute("auto_scale")  # Scale the clock up to fill the terminal
+    dashboard_clocks = SettingAttribute("dashboard_clocks")
+    timer_frame_rate = SettingAttribute("timer_frame_rate")
+    countdown_seconds = SettingAttribute("countdown_seconds")  # Length of the countdown timer
+
+    def __init__(self, stdscr, profile_path=None):
         self.stdscr = stdscr
         
         # Load user configuration
-        config = load_config()
-        self.show_seconds = config["show_seconds"]
-        self.show_date = config["show_date"]
-        self.date_format = config["date_format"]
-        self.show_menu_hint = config["show_menu_hint"]
-        self.current_font = config["current_font"]
-        self.current_color = config.get("current_color", 0)  # 0 = white, 1-7 = basic colors, 8 = rainbow
-        self.time_format_12hour = config.get("time_format_12hour", False)  # False = 24-hour, True = 12-hour
-        self.show_ampm = config.get("show_ampm", True)  # Whether to show AM/PM in 12-hour mode
+        self.settings = Settings.load()
         
         self.menu_open = False
         self.selected_menu_item = 0
-        self.font_names = ["Original", "Thick", "Thin", "Compact", "Wide"]
-        self.color_names = ["White", "Red", "Green", "Yellow", "Blue", "Magenta", "Cyan", "Rainbow"]
+        self.font_names = FONT_REGISTRY.names()
+        self.color_names = COLOR_NAMES
         self.menu_items = [
             "Show seconds",
             "Show date",
@@ -284,11 +1946,45 @@ class ClockApp:
             curses.init_pair(6, curses.COLOR_CYAN, curses.COLOR_BLACK)
             curses.init_pair(7, curses.COLOR_WHITE, curses.COLOR_BLACK)
             
-        self.stdscr.nodelay(True)  # Non-blocking input
-        self.stdscr.timeout(200)  # Refresh every 200ms
+        self.has_colors = curses.has_colors()
+        self.renderer = FrameRenderer(self.stdscr)
+        # The clock is the bottom panel; the hint, stats and menu are overlays
+        # above it (created for the screen size by handle_resize)
+        self.clock_panel = curses.panel.new_panel(self.stdscr)
+        self.overlays = {}
+        # Color pairs for the gradient modes, defined as hues are first drawn
+        self.colors = None
+        if self.has_colors:
+            # has_extended_color_support() is new in Python 3.10; without it
+            # gradients use fewer, palette-based colors
+            extended = getattr(curses, 'has_extended_color_support', lambda: False)()
+            self.colors = ColorAllocator(curses.COLORS, curses.COLOR_PAIRS, extended,
+                                         on_evict=self.renderer.forget_attr)
+        self.resize_pending = False  # Set by the SIGWINCH handler
+        self.layout = None  # Clock position, recomputed when layout_key changes
+        self.layout_key = None
+
+        self.stdscr.nodelay(True)  # Non-blocking input, pacing is done by the scheduler
+        self.scheduler = TickScheduler(sys.stdin.fileno())
+        self.input_pending = False
+        self.time_source = TimeSource()  # Replaceable with a FakeTimeSource
+        self.stats = FrameStats(profile_path)
+        self.show_stats = False  # F3 overlay
+        self.timer = None  # Stopwatch or countdown shown instead of the clock
+        self.alarms = AlarmSchedule.load(time.time())
+
+        # Results posted by background workers, handled on the UI loop
+        self.events = queue.Queue()
+        self.update_task_running = False
+        self.startup_task_running = False
+        self.notifications = Notifications()  # Timed status text for menu items
+        self.next_config_check = 0  # Next time config.json may be stat()ed for external edits
+        self.scale = 1  # Clock scale for auto_scale, recomputed when scale_key changes
+        self.scale_key = None
         
         # Update menu items to reflect loaded configuration
-        self.update_menu_items()
+        self.apply_settings(set(DEFAULT_CONFIG))
+        self.handle_resize()
     
     def update_menu_items(self):
         """Update menu items to reflect current configuration"""
@@ -322,222 +2018,496 @@ class ClockApp:
         
     def display_clock(self):
         """Display the large ASCII clock"""
-        # Format time string based on settings
-        if self.time_format_12hour:
-            # 12-hour format
-            if self.show_seconds:
-                time_str = time.strftime('%I:%M:%S')
+        started = time.perf_counter()
+        # Read the clock once so every part of the frame agrees
+        now = self.time_source.tick()
+        if self.timer is not None and self.timer.read():
+            try:
+                curses.beep()  # The countdown just ran out
+            except curses.error:
+                pass
+
+        # The size only changes on KEY_RESIZE/SIGWINCH (see handle_resize)
+        height, width = self.screen_size
+
+        renderer = self.renderer
+        renderer.begin()
+        if self.dashboard and self.timer is None:
+            self.draw_dashboard(now, height, width)
+        else:
+            self.draw_clock(now, height, width)
+
+        changed = renderer.flush()
+        writes, output_bytes = renderer.writes, renderer.bytes
+
+        # Menu hint, stats of the previous frame and the menu, each in its own window
+        for name, visible, draw in (('hint', self.show_menu_hint, self.display_hint),
+                                    ('stats', self.show_stats, self.display_stats),
+                                    ('menu', self.menu_open, self.display_menu),
+                                    ('alarm', self.notifications.get('alarm') is not None,
+                                     self.display_alarm)):
+            overlay = self.overlays.get(name)
+            if overlay is not None:
+                changed |= overlay.update(visible, draw)
+                writes += overlay.renderer.writes
+                output_bytes += overlay.renderer.bytes
+
+        # Stage every panel in stacking order, so overlays are redrawn over
+        # clock cells that changed beneath them, and send them in one go
+        if changed:
+            curses.panel.update_panels()
+            curses.doupdate()
+        self.stats.record(now, time.perf_counter() - started, writes, output_bytes, changed)
+
+    def display_alarm(self, put):
+        width = self.overlays['alarm'].renderer.width
+        text = f" {self.notifications.get('alarm', '')} "[:width - 2]
+        put('alarm_top', 0, 0, "+" + "-" * (width - 2) + "+")
+        put('alarm_text', 1, 0, "|" + text.center(width - 2) + "|", curses.A_BOLD)
+        put('alarm_bottom', 2, 0, "+" + "-" * (width - 2) + "+")
+
+    def display_hint(self, put):
+        put('hint', 0, 0, MENU_HINT)
+
+    def display_stats(self, put):
+        width = self.overlays['stats'].renderer.width  # Less than STATS_WIDTH on narrow screens
+        text = self.stats.overlay()[-width:]
+        put('stats', 0, width - len(text), text)
+
+    def draw_clock(self, now, height, width):
+        """Register the cells of the single centered clock and its date
+
+        With a stopwatch or countdown running the timer's digits and label take
+        the place of the time and date. Every glyph column is its own cell, so
+        at 30-60 frames a second the renderer only rewrites the columns of the
+        digits that changed, normally just the centiseconds.
+        """
+        if self.timer is not None:
+            time_str = self.timer.text()
+            date_str = self.timer.label()
+        else:
+            time_str = self.time_source.time_str(self.show_seconds, self.time_format_12hour, self.show_ampm)
+            date_str = self.time_source.date_str(self.date_format) if self.show_date else ''
+
+        # Use the selected font; every glyph column is its own cell
+        scale = self.clock_scale(len(time_str), height, width, bool(date_str)) if self.auto_scale else 1
+        strip = GLYPH_CACHE.render(self.current_font, time_str,
+                                   self.time_format_12hour, self.show_ampm, scale)
+        layout = self.clock_layout(strip.width, len(strip.rows), len(time_str), len(date_str), scale)
+
+        renderer = self.renderer
+        # Apply same color to date
+        date_attr = self.color_attr(1 if self.current_color >= RAINBOW else self.current_color)
+        if layout.degraded:
+            # The glyphs don't fit, show the time as plain text instead
+            renderer.put('time_text', layout.y, layout.x, time_str, date_attr)
+        elif self.current_color >= GRADIENT and self.colors:
+            self.put_gradient('gradient', strip, layout.y, layout.x, now)
+        else:
+            for i, row in enumerate(strip.cells):
+                attr = self.row_attr(i // scale)
+                y = layout.y + i
+                for j, (x, cell) in enumerate(row):
+                    renderer.put(('glyph', i, j), y, layout.x + x, cell, attr)
+
+        # Display date if enabled
+        if date_str:
+            renderer.put('date', layout.date_y, layout.date_x, date_str, date_attr)
+
+    def clock_layout(self, strip_width, clock_height, text_width, date_width, scale):
+        """Positions of the clock and date, recomputed only when a size involved changes"""
+        key = (self.screen_size, strip_width, clock_height, text_width, date_width, scale)
+        if key == self.layout_key:
+            return self.layout
+        height, width = self.screen_size
+        date_rows = 2 if date_width else 0
+        if strip_width <= width and clock_height <= height:
+            degraded = False
+            x = (width - strip_width) // 2
+            if scale == 1:
+                y = max(0, (height // 2) - 3)
             else:
-                time_str = time.strftime('%I:%M')
-                
-            # Add AM/PM if enabled
-            if self.show_ampm:
-                ampm = time.strftime('%p')  # Returns 'AM' or 'PM'
-                time_str += f" {ampm}"
+                # Center the scaled clock together with the date line below it
+                y = max(0, (height - clock_height - date_rows) // 2)
+            date_y = y + clock_height + 1
         else:
-            # 24-hour format
-            if self.show_seconds:
-                time_str = time.strftime('%H:%M:%S')
+            # Too small for the glyphs: plain text time, date right below if it fits
+            degraded = True
+            x = max(0, (width - text_width) // 2)
+            y = max(0, (height - date_rows) // 2)
+            date_y = y + 2 if y + 2 < height else y + 1
+        date_x = max(0, (width - date_width) // 2)
+        self.layout = ClockLayout(degraded, x, y, date_x, date_y)
+        self.layout_key = key
+        return self.layout
+
+    def clock_scale(self, chars, height, width, with_date):
+        """Largest integer scale at which a clock of this many characters fits the screen"""
+        key = (self.current_font, chars, with_date, height, width)
+        if key != self.scale_key:
+            base_width = GLYPH_CACHE.max_width(self.current_font) * chars
+            free_height = height - (2 if with_date else 0)
+            self.scale = max(1, min(width // base_width, free_height // 5))
+            self.scale_key = key
+        return self.scale
+
+    def draw_dashboard(self, now, height, width):
+        """Register the cells of a grid of labelled clocks, one per configured timezone
+
+        Panels use the big font when the whole grid fits and fall back to one
+        line of text per clock otherwise. All panels share the glyph cache and
+        the renderer only rewrites the glyphs that changed.
+        """
+        clocks = self.dashboard_clocks or [{"label": "Local"}]
+        panels = []
+        for entry in clocks:
+            zone_name = entry.get("timezone")
+            label = str(entry.get("label") or zone_name or "Local")
+            if not zone_name:
+                panels.append((label, self.time_source.time_str(
+                    self.show_seconds, self.time_format_12hour, self.show_ampm)))
+                continue
+            offset = ZONE_OFFSETS.offset(zone_name, now)
+            if offset is None:
+                panels.append((label, None))
             else:
-                time_str = time.strftime('%H:%M')
-            
-        # Use the selected font
-        current_font = FONTS[self.current_font]
-        rows = [''] * 5
-        for char in time_str:
-            seg = current_font.get(char, ['     '] * 5)
-            for i in range(5):
-                rows[i] += seg[i] + '  '
-        
-        # Display the clock in the center of the screen
-        height, width = self.stdscr.getmaxyx()
-        clock_width = len(rows[0])
-        start_x = max(0, (width - clock_width) // 2)
-        start_y = max(0, (height // 2) - 3)
-        
-        # Clear screen and display clock
-        self.stdscr.clear()
-        for i, row in enumerate(rows):
-            if start_y + i < height:
-                try:
-                    # Apply color based on selection
-                    if self.current_color == 7:  # Rainbow mode
-                        # For rainbow, we'll cycle through colors for each row
-                        color_pair = (i % 6) + 1  # Use colors 1-6
-                        if curses.has_colors():
-                            self.stdscr.addstr(start_y + i, start_x, row, curses.color_pair(color_pair))
-                        else:
-                            self.stdscr.addstr(start_y + i, start_x, row)
-                    elif self.current_color > 0 and self.current_color < 7 and curses.has_colors():  # Basic color
-                        self.stdscr.addstr(start_y + i, start_x, row, curses.color_pair(self.current_color))
-                    else:  # White or no color support
-                        self.stdscr.addstr(start_y + i, start_x, row)
-                except:
-                    pass  # Handle terminal size issues
-        
-        # Display date if enabled
-        if self.show_date and start_y + 6 < height:
-            try:
-                date_str = datetime.now().strftime(self.date_format)
-                date_x = max(0, (width - len(date_str)) // 2)
-                # Apply same color to date
-                if self.current_color == 7:  # Rainbow mode
-                    if curses.has_colors():
-                        self.stdscr.addstr(start_y + 6, date_x, date_str, curses.color_pair(1))
-                    else:
-                        self.stdscr.addstr(start_y + 6, date_x, date_str)
-                elif self.current_color > 0 and self.current_color < 7 and curses.has_colors():  # Basic color
-                    self.stdscr.addstr(start_y + 6, date_x, date_str, curses.color_pair(self.current_color))
-                else:  # White or no color support
-                    self.stdscr.addstr(start_y + 6, date_x, date_str)
-            except:
-                pass  # Handle terminal size issues
-        
-        # Display menu hint if enabled
-        if self.show_menu_hint:
+                panels.append((label, format_time(time.gmtime(now + offset), self.show_seconds,
+                                                  self.time_format_12hour, self.show_ampm)))
+
+        count = len(panels)
+        chars = max(len(time_str) for _, time_str in panels if time_str) if any(
+            time_str for _, time_str in panels) else 8
+        # Size panels for the widest glyphs so the grid doesn't move as digits change
+        clock_width = chars * GLYPH_CACHE.max_width(self.current_font)
+        panel_w = clock_width + DASHBOARD_GAP
+        panel_h = 7  # Label, five glyph rows and a blank line
+        cols = max(1, min(count, (width + DASHBOARD_GAP) // panel_w))
+        rows = -(-count // cols)
+        big = clock_width <= width and rows * panel_h <= height
+        if not big:
+            # One line per clock: "label  time"
+            label_w = min(max(len(label) for label, _ in panels), 24)
+            clock_width = label_w + 2 + chars
+            panel_w = clock_width + DASHBOARD_GAP
+            panel_h = 1
+            cols = max(1, min(count, (width + DASHBOARD_GAP) // panel_w))
+            rows = -(-count // cols)
+
+        origin_x = max(0, (width - (cols * panel_w - DASHBOARD_GAP)) // 2)
+        origin_y = max(0, (height - rows * panel_h) // 2)
+        renderer = self.renderer
+        attr = self.color_attr(1 if self.current_color >= RAINBOW else self.current_color)
+        gradient = self.current_color >= GRADIENT and self.colors
+        for p, (label, time_str) in enumerate(panels):
+            x = origin_x + (p % cols) * panel_w
+            y = origin_y + (p // cols) * panel_h
+            if y + panel_h > height:
+                break  # Out of room; the remaining clocks don't fit
+            if not big:
+                text = f"{label[:label_w]:<{label_w}}  {time_str or 'unknown zone'}"
+                renderer.put(('panel', p), y, x, text[:width - x], attr)
+                continue
+
+            renderer.put(('panel_label', p), y, x + max(0, (clock_width - len(label)) // 2),
+                         label[:clock_width], attr)
+            if time_str is None:
+                renderer.put(('panel', p), y + 3, x, "unknown zone"[:clock_width], attr)
+                continue
+            strip = GLYPH_CACHE.render(self.current_font, time_str,
+                                       self.time_format_12hour, self.show_ampm)
+            left = x + (clock_width - strip.width) // 2
+            if gradient:
+                self.put_gradient(('panel', p), strip, y + 1, left, now)
+                continue
+            for i, row in enumerate(strip.cells):
+                row_attr = self.row_attr(i)
+                for j, (cx, cell) in enumerate(row):
+                    renderer.put(('panel', p, i, j), y + 1 + i, left + cx, cell, row_attr)
+
+    def put_gradient(self, key, strip, top, left, now):
+        """Register a strip in the gradient colors as one cell per row and color run
+
+        Neighbouring bands that quantize to the same color share a run, so a
+        row is a handful of cells, and the renderer only rewrites the runs
+        whose text or color changed since the last frame.
+        """
+        bands = max(1, min(GRADIENT_BANDS, strip.width))
+        hues = gradient_hues(bands, gradient_phase(now, self.current_color))
+        runs = []  # (start column, attr)
+        for band, hue in enumerate(hues):
+            attr = self.colors.attr(hue)
+            if not runs or runs[-1][1] != attr:
+                runs.append((band * strip.width // bands, attr))
+
+        put = self.renderer.put
+        for i, row in enumerate(strip.rows):
+            for r, (start, attr) in enumerate(runs):
+                end = runs[r + 1][0] if r + 1 < len(runs) else len(row)
+                text = row[start:end]
+                if text.strip():
+                    put((key, i, start), top + i, left + start, text, attr)
+
+    def row_attr(self, row):
+        """Attribute for a row of clock glyphs"""
+        if self.current_color >= RAINBOW:  # Rainbow mode (gradients without color support)
+            # For rainbow, we'll cycle through colors for each row
+            return self.color_attr((row % 6) + 1)  # Use colors 1-6
+        return self.color_attr(self.current_color)
+
+    def handle_resize(self):
+        """Pick up a new terminal size; the next frame is a single full repaint"""
+        if self.resize_pending:
+            # Our SIGWINCH handler replaced curses' own, so tell curses the new size
+            self.resize_pending = False
             try:
-                hint = "Press F1 for menu"
-                hint_x = max(0, width - len(hint) - 2)
-                self.stdscr.addstr(1, hint_x, hint)
-            except:
-                pass  # Handle terminal size issues
-        
-        # Display menu if open
-        if self.menu_open:
-            self.display_menu()
-            
-        self.stdscr.refresh()
-    
-    def display_menu(self):
-        """Display the configuration menu"""
+                size = os.get_terminal_size(sys.__stdout__.fileno())
+                curses.resizeterm(size.lines, size.columns)
+            except (OSError, ValueError, curses.error):
+                pass
+        self.screen_size = height, width = self.stdscr.getmaxyx()
+        self.layout_key = None
+        self.renderer.resize(height, width)
+
+        # Overlays are recreated for the new size; the clock's full repaint
+        # covers whatever the old ones left behind
+        menu_height = len(self.menu_items) + 4
+        self.overlays = {}
+        for name, h, w, y, x in (
+                ('hint', 1, len(MENU_HINT), 1, max(0, width - len(MENU_HINT) - 2)),
+                ('stats', 1, STATS_WIDTH, 2, max(0, width - STATS_WIDTH - 2)),
+                ('menu', menu_height, MENU_WIDTH,
+                 max(0, (height - menu_height) // 2), max(0, (width - MENU_WIDTH) // 2)),
+                ('alarm', 3, min(width, ALARM_WIDTH), 0, max(0, (width - ALARM_WIDTH) // 2))):
+            overlay = Overlay.create(h, w, y, x, height, width)
+            if overlay is not None:
+                self.overlays[name] = overlay
+
+    def on_sigwinch(self, signum, frame):
+        """SIGWINCH handler: note the resize and wake the main loop"""
+        self.resize_pending = True
+        self.scheduler.wake()
+
+    def check_config_file(self):
+        """Apply external edits to config.json and alarms.json; stats them at most once per second"""
+        now = time.time()
+        if now < self.next_config_check:
+            return
+        self.next_config_check = int(now) + 1
+        changed = self.settings.reload_if_changed()
+        if changed:
+            self.apply_settings(changed)
+        if self.alarms.path and stat_file(self.alarms.path) != self.alarms.file_state:
+            self.alarms = AlarmSchedule.load(now)
+
+    def check_alarms(self, now):
+        """Show and beep for the alarms that are due"""
+        fired = self.alarms.pop_due(now)
+        if not fired:
+            return
+        self.notifications.show('alarm', ', '.join(alarm.label for _, alarm in fired), ALARM_SHOW_SECONDS)
         try:
-            height, width = self.stdscr.getmaxyx()
-            
-            # Menu dimensions
-            menu_width = 40
-            menu_height = len(self.menu_items) + 4
-            start_x = max(0, (width - menu_width) // 2)
-            start_y = max(0, (height - menu_height) // 2)
-            
-            # Draw menu border
-            try:
-                self.stdscr.addstr(start_y, start_x, "+" + "-" * (menu_width - 2) + "+")
-                for i in range(1, menu_height - 1):
-                    self.stdscr.addstr(start_y + i, start_x, "|" + " " * (menu_width - 2) + "|")
-                self.stdscr.addstr(start_y + menu_height - 1, start_x, "+" + "-" * (menu_width - 2) + "+")
-            except:
-                return  # Handle terminal size issues
-            
-            # Draw menu title
-            title = "Clock Settings"
-            title_x = start_x + (menu_width - len(title)) // 2
-            self.stdscr.addstr(start_y + 1, title_x, title)
-            
-            # Draw menu items
-            for i, item in enumerate(self.menu_items):
-                item_y = start_y + i + 3
-                item_x = start_x + 2
-                
-                # Update menu items to show current selections
-                if i == 0:  # Show seconds
-                    marker = "[●]" if self.show_seconds else "[ ]"
-                    display_item = f"{marker} {item}"
-                elif i == 1:  # Show date
-                    marker = "[●]" if self.show_date else "[ ]"
-                    display_item = f"{marker} {item}"
-                elif i == 2:  # DD/MM/YYYY
-                    marker = "(●)" if self.date_format == "%d/%m/%Y" else "( )"
-                    display_item = f"{marker} {item.replace('(●) ', '').replace('( ) ', '')}"
-                elif i == 3:  # MM/DD/YYYY
-                    marker = "(●)" if self.date_format == "%m/%d/%Y" else "( )"
-                    display_item = f"{marker} {item.replace('(●) ', '').replace('( ) ', '')}"
-                elif i == 4:  # YYYY/MM/DD
-                    marker = "(●)" if self.date_format == "%Y/%m/%d" else "( )"
-                    display_item = f"{marker} {item.replace('(●) ', '').replace('( ) ', '')}"
-                elif i == 5:  # Font
-                    display_item = item
-                elif i == 6:  # Version (info only)
-                    display_item = item
-                elif i == 7:  # Color
-                    display_item = item
-                elif i == 8:  # Time format: 12-hour
-                    marker = "(●)" if self.time_format_12hour else "( )"
+            curses.beep()
+        except curses.error:
+            pass
+
+    def apply_settings(self, changed):
+        """Bring the running app in line with settings that changed underneath it
+
+        The values have already been checked by sanitize_config.
+        """
+        # The glyph cache is keyed by font and time format and the renderer
+        # diffs every cell, so nothing has to be flushed for the new values to
+        # show; only the menu labels are derived state
+        self.update_menu_items()
+
+    def color_attr(self, color):
+        """Return the curses attribute for a color index (0 or no color support = plain)"""
+        if 0 < color < 7 and self.has_colors:
+            return curses.color_pair(color)
+        return 0
+    
+    def display_menu(self, put):
+        """Display the configuration menu (in its own window, see handle_resize)"""
+        menu_width = MENU_WIDTH
+        menu_height = len(self.menu_items) + 4
+        start_y, start_x = 0, 0
+
+        # Draw menu border
+        put(('menu', 0), start_y, start_x, "+" + "-" * (menu_width - 2) + "+")
+        for i in range(1, menu_height - 1):
+            put(('menu', i), start_y + i, start_x, "|" + " " * (menu_width - 2) + "|")
+        put(('menu', menu_height - 1), start_y + menu_height - 1, start_x, "+" + "-" * (menu_width - 2) + "+")
+
+        # Draw menu title
+        title = "Clock Settings"
+        title_x = start_x + (menu_width - len(title)) // 2
+        put('menu_title', start_y + 1, title_x, title)
+
+        # Draw menu items
+        for i, item in enumerate(self.menu_items):
+            item_y = start_y + i + 3
+            item_x = start_x + 2
+
+            # Update menu items to show current selections
+            if i == 0:  # Show seconds
+                marker = "[●]" if self.show_seconds else "[ ]"
+                display_item = f"{marker} {item}"
+            elif i == 1:  # Show date
+                marker = "[●]" if self.show_date else "[ ]"
+                display_item = f"{marker} {item}"
+            elif i == 2:  # DD/MM/YYYY
+                marker = "(●)" if self.date_format == "%d/%m/%Y" else "( )"
+                display_item = f"{marker} {item.replace('(●) ', '').replace('( ) ', '')}"
+            elif i == 3:  # MM/DD/YYYY
+                marker = "(●)" if self.date_format == "%m/%d/%Y" else "( )"
+                display_item = f"{marker} {item.replace('(●) ', '').replace('( ) ', '')}"
+            elif i == 4:  # YYYY/MM/DD
+                marker = "(●)" if self.date_format == "%Y/%m/%d" else "( )"
+                display_item = f"{marker} {item.replace('(●) ', '').replace('( ) ', '')}"
+            elif i == 5:  # Font
+                display_item = item
+            elif i == 6:  # Version (info only)
+                display_item = item
+            elif i == 7:  # Color
+                display_item = item
+            elif i == 8:  # Time format: 12-hour
+                marker = "(●)" if self.time_format_12hour else "( )"
+                display_item = f"{marker} {item.replace('(●) ', '').replace('( ) ', '')}"
+            elif i == 9:  # Show AM/PM
+                # Only show selection marker if 12-hour format is enabled
+                if self.time_format_12hour:
+                    marker = "(●)" if self.show_ampm else "( )"
                     display_item = f"{marker} {item.replace('(●) ', '').replace('( ) ', '')}"
-                elif i == 9:  # Show AM/PM
-                    # Only show selection marker if 12-hour format is enabled
-                    if self.time_format_12hour:
-                        marker = "(●)" if self.show_ampm else "( )"
-                        display_item = f"{marker} {item.replace('(●) ', '').replace('( ) ', '')}"
-                    else:
-                        display_item = f"( ) {item} (disabled)"  # Disabled in 24-hour mode
-                elif i == 10:  # Run at startup (Arch Linux)
-                    # Show whether startup is enabled or not
-                    if self.is_enabled_at_startup():
-                        display_item = "✓ Run at startup (Arch Linux)"
-                    else:
-                        display_item = "Run at startup (Arch Linux)"
                 else:
-                    display_item = item
-                    
-                # Highlight selected item
-                try:
-                    if i == self.selected_menu_item:
-                        self.stdscr.addstr(item_y, item_x, f"> {display_item}", curses.A_REVERSE)
-                    else:
-                        self.stdscr.addstr(item_y, item_x, f"  {display_item}")
-                except:
-                    pass  # Handle terminal size issues
-        except:
-            pass  # Handle any other terminal issues
+                    display_item = f"( ) {item} (disabled)"  # Disabled in 24-hour mode
+            elif i == 10:  # Run at startup (Arch Linux)
+                # Show whether startup is enabled or not
+                if self.is_enabled_at_startup():
+                    display_item = "✓ Run at startup (Arch Linux)"
+                else:
+                    display_item = "Run at startup (Arch Linux)"
+            else:
+                display_item = item
+            # A pending status message replaces the item's label
+            display_item = self.notifications.get(i, display_item)
+
+            # Highlight selected item
+            if i == self.selected_menu_item:
+                put(('menu_item', i), item_y, item_x, f"> {display_item}", curses.A_REVERSE)
+            else:
+                put(('menu_item', i), item_y, item_x, f"  {display_item}")
     
     def handle_input(self):
-        """Handle user input"""
+        """Handle every key that is waiting, so the next frame shows all of them"""
         try:
-            key = self.stdscr.getch()
-            
-            if key == -1:  # No input
-                return True
-                
-            # Handle F1 to toggle menu
-            if key == curses.KEY_F1 or key == ord('m'):
-                self.menu_open = not self.menu_open
-                self.selected_menu_item = 0
-                return True
-                
-            # Handle F2 to toggle menu hint
-            if key == curses.KEY_F2:
-                self.show_menu_hint = not self.show_menu_hint
-                # Save configuration when menu hint visibility changes
-                config = {
-                    "show_seconds": self.show_seconds,
-                    "show_date": self.show_date,
-                    "date_format": self.date_format,
-                    "show_menu_hint": self.show_menu_hint,
-                    "current_font": self.current_font,
-                    "current_color": self.current_color,
-                    "time_format_12hour": self.time_format_12hour,
-                    "show_ampm": self.show_ampm
-                }
-                save_config(config)
-                return True
-                
-            # Handle ESC to close menu
-            if key == 27:  # ESC key
-                self.menu_open = False
-                return True
-                
-            # Handle menu navigation
-            if self.menu_open:
-                if key == curses.KEY_UP:
-                    self.selected_menu_item = (self.selected_menu_item - 1) % len(self.menu_items)
-                elif key == curses.KEY_DOWN:
-                    self.selected_menu_item = (self.selected_menu_item + 1) % len(self.menu_items)
-                elif key == ord('\n') or key == ord(' '):  # Enter or Space key
-                    self.handle_menu_selection()
-                    
+            move = 0  # Net Up/Down presses in the menu, applied as one step
+            self.input_pending = True
+            for _ in range(INPUT_BATCH):
+                key = self.stdscr.getch()
+                if key == -1:  # No more input
+                    self.input_pending = False
+                    break
+                # Held or pasted arrows collapse into a single change of selection
+                if self.menu_open and key in (curses.KEY_UP, curses.KEY_DOWN):
+                    move += 1 if key == curses.KEY_DOWN else -1
+                    continue
+                if move:
+                    self.move_menu_selection(move)
+                    move = 0
+                if not self.handle_key(key):
+                    return False
+            # With input_pending still set the loop draws, then comes back without sleeping
+            if move:
+                self.move_menu_selection(move)
             return True
         except Exception as e:
             return False
+
+    def toggle_timer(self, duration):
+        """Show a stopwatch (duration None) or a countdown, or go back to the clock"""
+        if self.timer is not None and (self.timer.duration is None) == (duration is None):
+            self.timer = None
+        else:
+            self.timer = Timer(duration)
+
+    def next_frame_time(self, now):
+        """When the display next has to change: the timer's next frame while it runs,
+        otherwise the clock's next tick"""
+        if self.timer is not None and self.timer.running:
+            return next_timer_frame(now, self.timer_frame_rate)
+        return self.scheduler.next_tick(now, self.show_seconds)
+
+    def move_menu_selection(self, move):
+        self.selected_menu_item = (self.selected_menu_item + move) % len(self.menu_items)
+
+    def handle_key(self, key):
+        """Handle one key press"""
+        # Handle terminal resize reported by curses
+        if key == curses.KEY_RESIZE:
+            if self.stdscr.getmaxyx() != self.screen_size:
+                self.handle_resize()
+            return True
+
+        # Handle F1 to toggle menu
+        if key == curses.KEY_F1 or key == ord('m'):
+            self.menu_open = not self.menu_open
+            self.selected_menu_item = 0
+            return True
+
+        # Handle F2 to toggle menu hint
+        if key == curses.KEY_F2:
+            # Saved by the settings once the change settles
+            self.show_menu_hint = not self.show_menu_hint
+            return True
+
+        # Handle F3 to toggle the performance stats overlay
+        if key == curses.KEY_F3:
+            self.show_stats = not self.show_stats
+            return True
+
+        # Handle d to switch between the clock and the timezone dashboard
+        if key == ord('d') and not self.menu_open:
+            self.dashboard = not self.dashboard
+            return True
+
+        # Handle s to scale the clock up to fill the terminal
+        if key == ord('s') and not self.menu_open:
+            self.auto_scale = not self.auto_scale
+            return True
+
+        # Handle w and c to switch between the clock and the stopwatch or countdown
+        if key in (ord('w'), ord('c')) and not self.menu_open:
+            self.toggle_timer(None if key == ord('w') else self.countdown_seconds)
+            return True
+
+        # Handle ESC to close menu (and dismiss an alarm)
+        if key == 27:  # ESC key
+            self.menu_open = False
+            self.notifications.clear('alarm')
+            return True
+
+        # Space starts and pauses the timer, r resets it, Up/Down set the countdown length
+        if self.timer is not None and not self.menu_open:
+            if key == ord(' '):
+                self.timer.toggle()
+            elif key == ord('r'):
+                self.timer.reset()
+            elif key in (curses.KEY_UP, curses.KEY_DOWN) and self.timer.duration is not None:
+                step = 60 if key == curses.KEY_UP else -60
+                self.countdown_seconds = max(60, self.countdown_seconds + step)
+                self.timer.duration = self.countdown_seconds
+            return True
+
+        # Handle menu navigation
+        if self.menu_open:
+            if key == curses.KEY_UP:
+                self.selected_menu_item = (self.selected_menu_item - 1) % len(self.menu_items)
+            elif key == curses.KEY_DOWN:
+                self.selected_menu_item = (self.selected_menu_item + 1) % len(self.menu_items)
+            elif key == ord('\n') or key == ord(' '):  # Enter or Space key
+                self.handle_menu_selection()
+
+        return True
     
     def handle_menu_selection(self):
         """Handle menu item selection"""
@@ -552,7 +2522,7 @@ class ClockApp:
         elif self.selected_menu_item == 4:  # YYYY/MM/DD
             self.date_format = "%Y/%m/%d"
         elif self.selected_menu_item == 5:  # Font selection
-            self.current_font = (self.current_font + 1) % len(FONTS)
+            self.current_font = (self.current_font + 1) % len(FONT_REGISTRY)
         elif self.selected_menu_item == 6:  # Version info (non-actionable)
             pass  # Do nothing, just display info
         elif self.selected_menu_item == 7:  # Color selection
@@ -569,81 +2539,89 @@ class ClockApp:
             self.menu_open = False
             self.selected_menu_item = 0
         
-        # Update menu items to reflect changes (except for version, startup and updates)
+        # Update menu items to reflect changes (except for version, startup and updates).
+        # Changed settings are saved by self.settings after a short debounce.
         if self.selected_menu_item not in [6, 10, 11]:
             self.update_menu_items()
-        
-        # Save configuration whenever settings change (except for version, startup and updates)
-        if self.selected_menu_item not in [6, 10, 11]:
-            config = {
-                "show_seconds": self.show_seconds,
-                "show_date": self.show_date,
-                "date_format": self.date_format,
-                "show_menu_hint": self.show_menu_hint,
-                "current_font": self.current_font,
-                "current_color": self.current_color,
-                "time_format_12hour": self.time_format_12hour,
-                "show_ampm": self.show_ampm
-            }
-            save_config(config)
     
     def check_for_updates_menu(self):
-        """Check for updates and display result in menu"""
+        """Start an update check in the background; the result shows up in the menu"""
+        if self.update_task_running:
+            return
         # Update menu item to show checking status
-        self.menu_items[11] = "Checking for updates..."
-        self.display_menu()
-        self.stdscr.refresh()
-        
-        # Check for updates
-        update_info = check_for_updates()
-        
-        if update_info['available']:
+        self.notifications.show(11, "Checking for updates...")
+        self.update_task_running = True
+        self.run_in_background('update_check', check_for_updates)
+
+    def run_in_background(self, event, func, *args):
+        """Run func on a worker thread and post (event, result) back to the UI loop"""
+        def worker():
+            try:
+                result = func(*args)
+            except Exception as e:
+                result = e
+            self.events.put((event, result))
+            self.scheduler.wake()
+        threading.Thread(target=worker, daemon=True).start()
+
+    def post_update_progress(self, message):
+        """Called from the update worker: show download progress in the menu"""
+        self.events.put(('update_progress', message))
+        self.scheduler.wake()
+
+    def process_events(self):
+        """Handle everything background workers have posted since the last pass"""
+        while True:
+            try:
+                event, result = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if event == 'update_check':
+                self.on_update_checked(result)
+            elif event == 'update_progress':
+                self.notifications.show(11, result)
+            elif event == 'auto_update':
+                self.on_update_installed(result)
+            elif event == 'startup':
+                self.on_startup_toggled(result)
+
+        # Put menu items back once their status has been shown long enough
+        self.notifications.expire(time.time())
+
+    def show_update_status(self, message):
+        """Show an update status in the menu for a few seconds"""
+        self.notifications.show(11, message, 3)
+        self.update_task_running = False
+
+    def on_update_checked(self, update_info):
+        """Act on the result of a background update check"""
+        if update_info['available'] and update_info['version'] > VERSION:
             # Compare versions (simple string comparison for now)
-            if update_info['version'] > VERSION:
-                # Update available, prompt user to update
-                self.menu_items[11] = f"Update {update_info['version']} available. Updating..."
-                self.display_menu()
-                self.stdscr.refresh()
-                
-                # Perform auto-update
-                success, message = auto_update()
-                
-                if success:
-                    self.menu_items[11] = "Update successful! Restarting..."
-                    self.display_menu()
-                    self.stdscr.refresh()
-                    time.sleep(2)
-                    
-                    # Save current configuration before restarting
-                    config = {
-                        "show_seconds": self.show_seconds,
-                        "show_date": self.show_date,
-                        "date_format": self.date_format,
-                        "show_menu_hint": self.show_menu_hint,
-                        "current_font": self.current_font,
-                        "current_color": self.current_color,
-                        "time_format_12hour": self.time_format_12hour,
-                        "show_ampm": self.show_ampm
-                    }
-                    save_config(config)
-                    
-                    # Restart the application
-                    curses.endwin()
-                    os.execv(sys.executable, [sys.executable] + sys.argv)
-                else:
-                    self.menu_items[11] = message
-            else:
-                self.menu_items[11] = "No updates available"
+            self.notifications.show(11, f"Update {update_info['version']} available. Updating...")
+            self.run_in_background('auto_update', auto_update, self.post_update_progress)
         else:
-            self.menu_items[11] = "No updates available"
-        
-        # Keep the message visible for a few seconds (if not restarting)
-        self.display_menu()
-        self.stdscr.refresh()
-        time.sleep(3)
-        
-        # Reset menu item
-        self.menu_items[11] = "Check for updates"
+            self.show_update_status("No updates available")
+
+    def on_update_installed(self, result):
+        """Restart into the new version, or show why the update failed"""
+        if isinstance(result, Exception):
+            result = (False, f"Update failed: {result}")
+        success, message = result
+        if not success:
+            self.show_update_status(message)
+            return
+
+        # Leave the message up for a moment, then restart from the UI loop
+        self.notifications.show(11, "Update successful! Restarting...", 2, on_expire=self.restart)
+
+    def restart(self):
+        """Restart into the newly installed version"""
+        # Save current configuration before restarting
+        self.settings.flush()
+
+        # Restart the application
+        curses.endwin()
+        os.execv(sys.executable, [sys.executable] + sys.argv)
 
     def is_arch_linux(self):
         """Check if the system is Arch Linux"""
@@ -667,78 +2645,73 @@ class ClockApp:
             return False
 
     def toggle_startup(self):
-        """Enable or disable the application to run at startup"""
+        """Enable or disable the application to run at startup (systemctl runs in the background)"""
+        if self.startup_task_running:
+            return
         if not self.is_arch_linux():
             # Update menu to show error
-            self.menu_items[8] = "Error: Not Arch Linux"
-            self.display_menu()
-            self.stdscr.refresh()
-            time.sleep(2)
-            self.menu_items[8] = "Run at startup (Arch Linux)"
+            self.notifications.show(10, "Error: Not Arch Linux", 2)
             return
-            
-        try:
-            # Create the systemd user directory if it doesn't exist
-            systemd_dir = os.path.expanduser('~/.config/systemd/user')
-            os.makedirs(systemd_dir, exist_ok=True)
-            
-            service_file = os.path.join(systemd_dir, 'that-clock-sucks.service')
-            
-            # If service file exists, disable and remove it
-            if os.path.exists(service_file):
-                # Disable the service
-                os.system('systemctl --user disable that-clock-sucks.service 2>/dev/null')
-                # Remove the service file
-                os.remove(service_file)
-                # Update menu to show disabled
-                self.menu_items[8] = "Startup disabled"
-            else:
-                # Create the service file
-                script_path = os.path.abspath(__file__)
-                service_content = f"""[Unit]
-Description=That Clock Sucks
-After=graphical-session.target
-
-[Service]
-Type=simple
-ExecStart=/usr/bin/python3 {script_path}
-Restart=always
-RestartSec=5
+        enable = not self.is_enabled_at_startup()
+        self.notifications.show(10, "Enabling startup..." if enable else "Disabling startup...")
+        self.startup_task_running = True
+        self.run_in_background('startup', set_startup_service, enable)
 
-[Install]
-WantedBy=default.target
-"""
-                with open(service_file, 'w') as f:
-                    f.write(service_content)
-                
-                # Reload systemd user daemon
-                os.system('systemctl --user daemon-reload 2>/dev/null')
-                # Enable the service
-                os.system('systemctl --user enable that-clock-sucks.service 2>/dev/null')
-                # Update menu to show enabled
-                self.menu_items[8] = "Startup enabled"
-                
-            self.display_menu()
-            self.stdscr.refresh()
-            time.sleep(2)
-            self.menu_items[8] = "Run at startup (Arch Linux)"
-            
-        except Exception as e:
-            # Update menu to show error
-            self.menu_items[8] = f"Error: {str(e)}"
-            self.display_menu()
-            self.stdscr.refresh()
-            time.sleep(2)
-            self.menu_items[8] = "Run at startup (Arch Linux)"
+    def on_startup_toggled(self, result):
+        """Show the outcome of set_startup_service in the menu"""
+        self.startup_task_running = False
+        if isinstance(result, Exception):
+            result = f"Error: {result}"
+        self.notifications.show(10, result, 2)
 
     def run(self):
         """Main application loop"""
-        while True:
-            self.display_clock()
-            if not self.handle_input():
-                break
+        # Stopping the systemd service sends SIGTERM; exit cleanly so settings get saved
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        # Same when the terminal window is closed, so the --profile summary is written too
+        signal.signal(signal.SIGHUP, lambda signum, frame: sys.exit(0))
+        # Resizes wake the loop right away instead of waiting for the next tick
+        if hasattr(signal, 'SIGWINCH'):
+            signal.signal(signal.SIGWINCH, self.on_sigwinch)
+        try:
+            while True:
+                if self.resize_pending:
+                    self.handle_resize()
+                self.process_events()
+                self.check_alarms(time.time())
+                self.settings.flush_due(time.time())
+                self.display_clock()
+                # Sleep until a key is pressed, the displayed time changes, a worker
+                # reports back or changed settings are due to be saved
+                if not self.input_pending:
+                    tick = deadline = self.next_frame_time(time.time())
+                    if self.current_color == ANIMATED_GRADIENT and self.colors:
+                        deadline = min(deadline, next_gradient_step(time.time()))
+                    for pending in (self.notifications.next_deadline(), self.alarms.next_due(),
+                                    self.settings.save_at):
+                        if pending is not None:
+                            deadline = min(deadline, pending)
+                    if not self.scheduler.wait(deadline):
+                        if deadline == tick:
+                            self.stats.due = tick  # Measure how late the tick's frame is
+                        self.check_config_file()
+                        continue
+                if not self.handle_input():
+                    break
+        finally:
+            self.settings.flush()
+            self.stats.close()
 
 def main():
+    args = parse_args()
+    if args.serve:
+        serve(args.serve)
+        return
+    if args.connect:
+        sys.exit(connect(args.connect))
+    if args.export:
+        sys.exit(export(args))
+
     # Check if running in a terminal
     if not sys.stdin.isatty() or not os.environ.get('TERM'):
         # Fall back to simple clock if not in a proper terminal
@@ -746,7 +2719,7 @@ def main():
         return
         
     try:
-        curses.wrapper(curses_main)
+        curses.wrapper(curses_main, args.profile)
     except Exception as e:
         # Fall back to simple clock if curses fails
         print(f"Terminal interface failed: {e}")
@@ -754,23 +2727,391 @@ def main():
         time.sleep(2)
         simple_clock()
 
-def curses_main(stdscr):
-    app = ClockApp(stdscr)
+def curses_main(stdscr, profile_path=None):
+    app = ClockApp(stdscr, profile_path)
     app.run()
 
 def simple_clock():
     """Simple version of the clock without curses interface"""
-    # Use the original font for the simple clock
-    digits = FONTS[0]
-    while True:
-        t = time.strftime('%H:%M:%S')
-        rows = [''] * 5
-        for char in t:
-            seg = digits.get(char, ['     '] * 5)
-            for i in range(5):
-                rows[i] += seg[i] + '  '
-        print('\033[2J\033[H' + '\n'.join(rows))
-        time.sleep(1)
+    config = load_config()
+    font = config["current_font"]
+    encoder = AnsiFrameEncoder(config["current_color"])
+    out = sys.stdout.buffer
+    # Clear once and hide the cursor; after that only changed glyphs are sent
+    out.write(ANSI_CLEAR.encode())
+    time_source = TimeSource()
+    try:
+        while True:
+            now = time_source.tick()
+            time_str = time_source.time_str(config["show_seconds"],
+                                            config.get("time_format_12hour", False),
+                                            config.get("show_ampm", True))
+            strip = GLYPH_CACHE.render(font, time_str, config.get("time_format_12hour", False),
+                                       config.get("show_ampm", True))
+            frame = encoder.encode(strip)
+            if frame:
+                out.write(frame.encode())
+                out.flush()
+            # Sleep until the next absolute boundary instead of a fixed second,
+            # which drifts and eventually skips or repeats a second
+            deadline = TickScheduler.next_tick(now, config["show_seconds"])
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                time.sleep(remaining)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Put the cursor back below the clock
+        out.write(ANSI_RESTORE.encode())
+        out.flush()
+
+class AsciicastWriter:
+    """Stream frames as an asciicast v2 recording (a header line, then one event per frame)"""
+
+    def __init__(self, out, width, height, start, encoder):
+        self.out = out
+        self.start = start
+        self.encoder = encoder
+        header = {"version": 2, "width": width, "height": height, "timestamp": int(start)}
+        out.write(json.dumps(header) + '\n')
+        self.prefix = ANSI_CLEAR  # The first event clears the player's screen
+
+    def frame(self, now, changes):
+        data = self.prefix + self.encoder.escapes(changes)
+        self.prefix = ''
+        self.out.write(json.dumps([round(now - self.start, 3), "o", data], ensure_ascii=False) + '\n')
+
+class FrameDumpWriter:
+    """Stream frames as JSON lines of changed cells, after a header describing the clock"""
+
+    def __init__(self, out, width, height, start, encoder):
+        self.out = out
+        self.start = start
+        header = {"width": width, "height": height, "start": start,
+                  "color": encoder.color, "top": encoder.top, "left": encoder.left}
+        out.write(json.dumps(header) + '\n')
+
+    def frame(self, now, changes):
+        self.out.write(json.dumps({"t": round(now - self.start, 3), "cells": changes}, ensure_ascii=False) + '\n')
+
+EXPORT_WRITERS = {"asciicast": AsciicastWriter, "frames": FrameDumpWriter}
+
+def tick_times(start, duration, show_seconds=True):
+    """Every time the clock changes in [start, start + duration), starting with start itself"""
+    period = 1 if show_seconds else 60
+    end = start + duration
+    now = start
+    while now < end:
+        yield now
+        now = TickScheduler.next_tick(now, show_seconds) if now % period else now + period
+
+def export_clock(out, times, font=0, color=0, show_seconds=True, twelve_hour=False,
+                 show_ampm=True, fmt="asciicast", table=None):
+    """Render the clock at each of the given times and stream only the changes to out
+
+    times is the time source: any iterable of timestamps, e.g. tick_times().
+    With a FrameTable for the same font and format, frames are looked up in
+    it instead of being rendered. Frames whose glyphs didn't change are
+    skipped. Returns the number of frames written.
+    """
+    encoder = AnsiFrameEncoder(color)
+    writer = None
+    frames = 0
+    for now in times:
+        local = time.localtime(now)
+        if table is not None:
+            rows = table.rows(table.index(local))
+        else:
+            time_str = format_time(local, show_seconds, twelve_hour, show_ampm)
+            rows = GLYPH_CACHE.render(font, time_str, twelve_hour, show_ampm).rows
+        if writer is None:
+            width = encoder.left - 1 + max(len(row) for row in rows)
+            writer = EXPORT_WRITERS[fmt](out, width, encoder.top + len(rows), now, encoder)
+        changes = encoder.diff_rows(rows)
+        if changes:
+            writer.frame(now, changes)
+            frames += 1
+    return frames
+
+def parse_duration(text):
+    """Seconds in a duration like 90, 90s, 15m or 24h"""
+    units = {"s": 1, "m": 60, "h": 3600}
+    if text and text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+def parse_start(text):
+    """Timestamp of 'HH:MM[:SS]' today or a full 'YYYY-MM-DD HH:MM[:SS]' (local time)"""
+    from datetime import datetime
+
+    if len(text) <= 8:
+        text = f"{datetime.now():%Y-%m-%d} {text}"
+    return datetime.fromisoformat(text).timestamp()
+
+def pick(names, value):
+    """Index of a font or color given by name (any case) or number"""
+    lowered = [name.lower() for name in names]
+    if value.lower() in lowered:
+        return lowered.index(value.lower())
+    if value.isdigit() and int(value) < len(names):
+        return int(value)
+    raise ValueError(f"unknown choice {value!r}, expected one of: {', '.join(names)}")
+
+def export(args):
+    """Write the --export recording from the command line options"""
+    config = load_config()
+    try:
+        font = pick(FONT_REGISTRY.names(), args.font) if args.font else config["current_font"]
+        color = pick(COLOR_NAMES, args.color) if args.color else config["current_color"]
+        start = parse_start(args.start) if args.start else int(time.time())
+        duration = parse_duration(args.duration)
+    except ValueError as e:
+        print(f"Export failed: {e}")
+        return 1
+    show_seconds = config["show_seconds"]
+    twelve_hour, ampm = config["time_format_12hour"], config["show_ampm"]
+    times = tick_times(start, duration, show_seconds)
+
+    started = time.perf_counter()
+    # Rendering the whole day up front pays off once the range is long enough;
+    # the table goes straight to disk and is mapped, so memory use stays flat
+    table = FrameTable.cached(font, show_seconds, twelve_hour, ampm) if duration >= 3600 else None
+    if args.export == '-':
+        frames = export_clock(sys.stdout, times, font, color, show_seconds,
+                              twelve_hour, ampm, args.format, table)
+    else:
+        with open(args.export, 'w', encoding='utf-8', buffering=1 << 20) as out:
+            frames = export_clock(out, times, font, color, show_seconds,
+                                  twelve_hour, ampm, args.format, table)
+        print(f"Wrote {frames} frames to {args.export} in {time.perf_counter() - started:.1f}s")
+    return 0
+
+# Default address of the clock server (--serve/--connect)
+DEFAULT_SOCKET = os.path.join(os.environ.get('XDG_RUNTIME_DIR') or '/tmp', 'that-clock-sucks.sock')
+
+# Bytes a server client may have queued before it counts as behind, about
+# two keyframes; the kernel send buffer is shrunk to the same size so a slow
+# terminal never has more than a few seconds of stale frames in flight
+CLIENT_HIGH_WATER = 2 * 1024
+
+def parse_address(address):
+    """Split a --serve/--connect address into ('unix', path) or ('tcp', (host, port))
+
+    A bare port or host:port is TCP (on localhost if no host is given),
+    anything else is the path of a Unix socket.
+    """
+    host, _, port = address.rpartition(':')
+    if port.isdigit() and '/' not in address:
+        return 'tcp', (host or '127.0.0.1', int(port))
+    return 'unix', address
+
+class ClockServer:
+    """Render the clock once per tick and stream it to any number of terminals
+
+    Every client gets the same diffed ANSI frames from a single
+    AnsiFrameEncoder. New clients, and clients that fell behind, get a
+    keyframe (clear screen plus the complete clock) instead of the delta.
+    """
+
+    def __init__(self, config, time_source=None):
+        self.time_source = time_source or TimeSource()
+        self.font = config["current_font"]
+        self.color = config["current_color"]
+        self.show_seconds = config["show_seconds"]
+        self.twelve_hour = config.get("time_format_12hour", False)
+        self.show_ampm = config.get("show_ampm", True)
+        self.encoder = AnsiFrameEncoder(self.color)
+        self.clients = set()
+        self.strip = None
+        self._keyframe = None  # Built on demand, at most once per frame
+
+    def render(self):
+        time_str = self.time_source.time_str(self.show_seconds, self.twelve_hour, self.show_ampm)
+        return GLYPH_CACHE.render(self.font, time_str, self.twelve_hour, self.show_ampm)
+
+    def keyframe(self):
+        """The current frame from a blank screen, for clients that have nothing yet"""
+        if self._keyframe is None:
+            self._keyframe = (ANSI_CLEAR + AnsiFrameEncoder(self.color).encode(self.strip)).encode()
+        return self._keyframe
+
+    def tick(self):
+        """Render the frame for the current time and send it to every client"""
+        self.time_source.tick()
+        strip = self.render()
+        if strip is self.strip:
+            return
+        self.strip = strip
+        self._keyframe = None
+        delta = self.encoder.encode(strip).encode()
+        for client in self.clients:
+            if client.paused or client.transport.get_write_buffer_size():
+                # The kernel won't take more: skip frames until it drains, then resync
+                client.needs_keyframe = True
+                client.frames_dropped += 1
+            elif client.needs_keyframe:
+                client.send(self.keyframe())
+                client.needs_keyframe = False
+            elif delta:
+                client.send(delta)
+
+    async def run(self):
+        """Tick on every second (or minute) boundary until cancelled"""
+        import asyncio
+
+        while True:
+            self.tick()
+            deadline = TickScheduler.next_tick(self.time_source.now, self.show_seconds)
+            await asyncio.sleep(max(0.0, deadline - time.time()))
+
+class ClockStream:
+    """One client connection of a ClockServer (an asyncio protocol)"""
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.paused = False  # Set while the transport's write buffer is over the high-water mark
+        self.needs_keyframe = True
+        self.bytes_sent = 0
+        self.frames_dropped = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        transport.set_write_buffer_limits(high=CLIENT_HIGH_WATER)
+        sock = transport.get_extra_info('socket')
+        if sock is not None:
+            import socket
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, CLIENT_HIGH_WATER)
+            except OSError:
+                pass  # Keep the default buffer
+        self.server.clients.add(self)
+        if self.server.strip is not None:
+            self.send(self.server.keyframe())
+            self.needs_keyframe = False
+
+    def connection_lost(self, exc):
+        self.server.clients.discard(self)
+
+    def data_received(self, data):
+        pass  # Clients only listen
+
+    def eof_received(self):
+        return False  # Close our side too
+
+    def pause_writing(self):
+        self.paused = True
+
+    def resume_writing(self):
+        self.paused = False
+
+    def send(self, data):
+        if not self.transport.is_closing():
+            self.transport.write(data)
+            self.bytes_sent += len(data)
+
+async def start_server(server, address):
+    """Listen for clients of a ClockServer on a Unix socket or TCP address"""
+    import asyncio
+    import stat
+
+    loop = asyncio.get_running_loop()
+    kind, target = parse_address(address)
+    if kind == 'tcp':
+        return await loop.create_server(lambda: ClockStream(server), *target)
+    # Replace a socket left behind by a server that didn't shut down cleanly
+    try:
+        if stat.S_ISSOCK(os.stat(target).st_mode):
+            os.unlink(target)
+    except FileNotFoundError:
+        pass
+    return await loop.create_unix_server(lambda: ClockStream(server), target)
+
+def serve(address):
+    """Run the clock server until interrupted"""
+    import asyncio
+
+    async def run():
+        server = ClockServer(load_config())
+        listener = await start_server(server, address)
+        async with listener:
+            await server.run()
+
+    print(f"Serving the clock on {address} (Ctrl+C to stop)")
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        kind, target = parse_address(address)
+        if kind == 'unix':
+            try:
+                os.unlink(target)
+            except OSError:
+                pass
+
+def connect(address):
+    """Thin client: copy a clock server's stream to the terminal until it closes"""
+    import socket
+
+    kind, target = parse_address(address)
+    try:
+        if kind == 'tcp':
+            sock = socket.create_connection(target)
+        else:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(target)
+    except OSError as e:
+        print(f"Could not connect to {address}: {e}")
+        return 1
+
+    out = sys.stdout.buffer
+    try:
+        with sock:
+            while True:
+                data = sock.recv(65536)
+                if not data:
+                    break
+                out.write(data)
+                out.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        out.write(ANSI_RESTORE.encode())
+        out.flush()
+    return 0
+
+def parse_args(argv=None):
+    """Parse the command line; a plain start skips argparse, which takes a while to import"""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        import types
+
+        return types.SimpleNamespace(serve=None, connect=None, export=None, profile=None)
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="A big ASCII clock for the terminal")
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument('--serve', nargs='?', const=DEFAULT_SOCKET, metavar='ADDRESS',
+                       help="render the clock once and stream it to clients on a Unix socket "
+                            f"path or [host:]port (default {DEFAULT_SOCKET})")
+    modes.add_argument('--connect', nargs='?', const=DEFAULT_SOCKET, metavar='ADDRESS',
+                       help="show the clock streamed by a --serve instance")
+    modes.add_argument('--export', metavar='FILE',
+                       help="render a time range as fast as possible and write it to FILE ('-' for stdout)")
+    parser.add_argument('--profile', metavar='FILE',
+                        help="write per-frame stats as JSON lines to FILE, with p50/p99 at exit")
+    options = parser.add_argument_group("export options")
+    options.add_argument('--format', choices=sorted(EXPORT_WRITERS), default="asciicast",
+                         help="asciicast v2 recording or JSON lines of changed cells (default asciicast)")
+    options.add_argument('--start', help="'HH:MM[:SS]' today or 'YYYY-MM-DD HH:MM[:SS]' (default now)")
+    options.add_argument('--duration', default="60s", help="length such as 90s, 15m or 24h (default 60s)")
+    options.add_argument('--font', help="font name or number (default from config.json)")
+    options.add_argument('--color', help="color name or number (default from config.json)")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file